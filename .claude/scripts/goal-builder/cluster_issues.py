@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""Local pre-clustering of open GitHub issues for ``/analyze-issues``.
+
+Instead of reading every open issue, the agent reads this script's output: a
+compact list of candidate groups (top terms, label counts, member titles), the
+issues that fit no group, and likely duplicates.
+
+- Issues come from the shared mirror (``mirror.py``), synced if stale.
+- Each issue is tokenized once into weighted term counts (title x3, labels x2,
+  body x1) cached in ``issue_terms`` in mirror.db, keyed by ``updated_at``; only
+  new or changed issues are re-tokenized.
+- TF-IDF vectors are built from the cached counts with NumPy, compared by cosine
+  similarity, and merged with average-linkage clustering until no pair of groups
+  is more similar than ``analyze.threshold``.
+- Clustering ignores terms rarer than ``analyze.min_df`` issues; duplicate
+  detection keeps every term, since the rare ones are what tell two
+  similar-sounding issues apart.
+
+Usage:
+    python .claude/scripts/goal-builder/cluster_issues.py clusters [--threshold 0.3] [--json]
+    python .claude/scripts/goal-builder/cluster_issues.py similar 11 [--top 5]
+
+Settings live in ``analyze`` in config.yaml.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+from shared.mirror import open_mirror, sync_if_stale  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:
+    raise SystemExit("cluster_issues.py needs numpy: pip install numpy")
+
+DEFAULTS = {
+    "threshold": 0.3,
+    "duplicate_threshold": 0.8,
+    "min_df": 2,
+    "titles_per_group": 8,
+    "max_duplicates": 20,
+}
+
+# Bump when tokenization changes so cached term counts are rebuilt.
+TOKENIZER_VERSION = 1
+
+TERMS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issue_terms (
+    number      INTEGER PRIMARY KEY,
+    updated_at  TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    terms       TEXT NOT NULL
+);
+"""
+
+STOP_WORDS = frozenset("""
+a an and are as at be been but by can could do does for from has have how i if in into is it its
+me my no not of on or our should so that the their then there these this to was we were what when
+which while who will with would you your also just like need needs new get use using used make
+able want should add issue issues currently would please any all some more there here
+""".split())
+
+CODE_BLOCK = re.compile(r"```.*?```", re.S)
+URL = re.compile(r"https?://\S+")
+WORD = re.compile(r"[a-z][a-z0-9_]+")
+
+
+def words(text):
+    text = URL.sub(" ", CODE_BLOCK.sub(" ", (text or "").lower()))
+    for word in WORD.findall(text):
+        if word in STOP_WORDS or len(word) < 3:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith(("ss", "us", "is", "es")):
+            word = word[:-1]
+        yield word
+
+
+def issue_terms(issue):
+    """Weighted term counts for one issue."""
+    terms = Counter()
+    for word in words(issue["title"]):
+        terms[word] += 3
+    for word in words(issue.get("body")):
+        terms[word] += 1
+    for label in issue["labels"]:
+        terms["label:" + label.lower()] += 2
+    return terms
+
+
+class TermCache:
+    """Per-issue term counts in mirror.db, refreshed only for changed issues."""
+
+    def __init__(self, mirror):
+        self.db = mirror.db
+        self.db.executescript(TERMS_SCHEMA)
+
+    def load(self, issues):
+        """Return ``{number: Counter}`` for ``issues``; also returns how many were (re)built."""
+        cached = {
+            row["number"]: row
+            for row in self.db.execute("SELECT * FROM issue_terms WHERE version = ?", (TOKENIZER_VERSION,))
+        }
+        result, rebuilt = {}, []
+        for issue in issues:
+            row = cached.get(issue["number"])
+            if row is not None and row["updated_at"] == issue["updated_at"]:
+                result[issue["number"]] = Counter(json.loads(row["terms"]))
+            else:
+                terms = issue_terms(issue)
+                result[issue["number"]] = terms
+                rebuilt.append((issue["number"], issue["updated_at"], TOKENIZER_VERSION, json.dumps(terms)))
+        if rebuilt:
+            with self.db:
+                self.db.executemany("INSERT OR REPLACE INTO issue_terms VALUES (?, ?, ?, ?)", rebuilt)
+        return result, len(rebuilt)
+
+
+def tfidf(term_counts, min_df):
+    """L2-normalized TF-IDF matrix (issues x vocabulary) plus the vocabulary."""
+    df = Counter()
+    for terms in term_counts:
+        df.update(terms.keys())
+    vocab = sorted(t for t, n in df.items() if n >= min_df)
+    column = {t: i for i, t in enumerate(vocab)}
+
+    matrix = np.zeros((len(term_counts), len(vocab)), dtype=np.float32)
+    for row, terms in enumerate(term_counts):
+        for term, count in terms.items():
+            if term in column:
+                matrix[row, column[term]] = 1 + np.log(count)
+    idf = np.log((1 + len(term_counts)) / (1 + np.array([df[t] for t in vocab], dtype=np.float32))) + 1
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix, vocab
+
+
+def average_linkage(sim, threshold):
+    """Merge the most similar pair of groups until none exceeds ``threshold``."""
+    n = len(sim)
+    groups = [[i] for i in range(n)]
+    sizes = np.ones(n)
+    scores = sim.astype(np.float64)
+    np.fill_diagonal(scores, -np.inf)
+    while n > 1:
+        i, j = np.unravel_index(np.argmax(scores), scores.shape)
+        if scores[i, j] < threshold:
+            break
+        merged = (scores[i] * sizes[i] + scores[j] * sizes[j]) / (sizes[i] + sizes[j])
+        scores[i], scores[:, i] = merged, merged
+        scores[i, i] = -np.inf
+        scores[j], scores[:, j] = -np.inf, -np.inf
+        sizes[i] += sizes[j]
+        groups[i] += groups[j]
+        groups[j] = []
+    return [sorted(g) for g in groups if g]
+
+
+def analyze(issues, term_counts, settings):
+    matrix, vocab = tfidf(term_counts, settings["min_df"])
+    sim = matrix @ matrix.T
+    groups, unclustered = [], []
+    for members in average_linkage(sim, settings["threshold"]):
+        if len(members) == 1:
+            unclustered.append(issues[members[0]]["number"])
+            continue
+        centroid = matrix[members].mean(axis=0)
+        block = sim[np.ix_(members, members)]
+        top = [vocab[i] for i in np.argsort(centroid)[::-1] if centroid[i] > 0]
+        labels = Counter(label for m in members for label in issues[m]["labels"])
+        groups.append({
+            "size": len(members),
+            "cohesion": round(float((block.sum() - len(members)) / (len(members) * (len(members) - 1))), 2),
+            "terms": [t for t in top if not t.startswith("label:")][:6],
+            "labels": dict(labels.most_common(4)),
+            "issues": [{"number": issues[m]["number"], "title": issues[m]["title"]} for m in members],
+        })
+    groups.sort(key=lambda g: (-g["size"], -g["cohesion"]))
+
+    full, _ = tfidf(term_counts, 1)
+    upper = np.triu(full @ full.T, k=1)
+    pairs = np.argwhere(upper >= settings["duplicate_threshold"])
+    pairs = pairs[np.argsort(-upper[pairs[:, 0], pairs[:, 1]], kind="stable")][:settings["max_duplicates"]]
+    duplicates = [
+        {"a": issues[a]["number"], "b": issues[b]["number"], "similarity": round(float(upper[a, b]), 2)}
+        for a, b in pairs
+    ]
+    return {"issues": len(issues), "groups": groups, "unclustered": unclustered, "duplicates": duplicates}
+
+
+def similar(issues, term_counts, number, top, min_df):
+    matrix, _ = tfidf(term_counts, min_df)
+    index = next((i for i, issue in enumerate(issues) if issue["number"] == number), None)
+    if index is None:
+        raise SystemExit(f"#{number} is not an open issue in the mirror")
+    scores = matrix @ matrix[index]
+    order = [i for i in np.argsort(scores)[::-1] if i != index][:top]
+    return [(issues[i]["number"], float(scores[i]), issues[i]["title"]) for i in order]
+
+
+def shorten(text, width=70):
+    return text if len(text) <= width else text[:width - 1] + "…"
+
+
+def print_report(report, settings):
+    clustered = sum(g["size"] for g in report["groups"])
+    print(f"{report['issues']} open issues -> {len(report['groups'])} candidate groups "
+          f"({clustered} issues), {len(report['unclustered'])} unclustered [threshold {settings['threshold']}]")
+    for n, group in enumerate(report["groups"], 1):
+        labels = ", ".join(f"{k}({v})" for k, v in group["labels"].items()) or "-"
+        print(f"\nG{n}  {group['size']} issues  cohesion {group['cohesion']:.2f}  labels: {labels}")
+        print(f"    terms: {', '.join(group['terms'])}")
+        shown = group["issues"][:settings["titles_per_group"]]
+        for issue in shown:
+            print(f"    #{issue['number']} {shorten(issue['title'])}")
+        rest = group["issues"][len(shown):]
+        if rest:
+            print(f"    +{len(rest)} more: " + ", ".join(f"#{i['number']}" for i in rest))
+    if report["unclustered"]:
+        print(f"\nUnclustered ({len(report['unclustered'])}): " + ", ".join(f"#{n}" for n in report["unclustered"]))
+    if report["duplicates"]:
+        print("\nPossible duplicates: " + ", ".join(
+            f"#{d['a']} ~ #{d['b']} ({d['similarity']:.2f})" for d in report["duplicates"]
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_clusters = sub.add_parser("clusters", help="candidate groups for /analyze-issues")
+    p_clusters.add_argument("--threshold", type=float, help="min average cosine similarity to merge groups")
+    p_clusters.add_argument("--json", action="store_true")
+    p_similar = sub.add_parser("similar", help="issues most similar to one issue")
+    p_similar.add_argument("number", type=int)
+    p_similar.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    settings = {**DEFAULTS, **config.get("analyze", {})}
+    if getattr(args, "threshold", None) is not None:
+        settings["threshold"] = args.threshold
+
+    mirror = open_mirror(config)
+    sync_if_stale(config, mirror, ["github"])
+    issues = mirror.github_issues("open", body=True)
+    if not issues:
+        print("(no open issues)")
+        return
+    counts, rebuilt = TermCache(mirror).load(issues)
+    term_counts = [counts[issue["number"]] for issue in issues]
+
+    if args.command == "similar":
+        for number, score, title in similar(issues, term_counts, args.number, args.top, settings["min_df"]):
+            print(f"#{number:<6} {score:.2f}  {shorten(title)}")
+        return
+
+    report = analyze(issues, term_counts, settings)
+    if args.json:
+        print(json.dumps({**report, "retokenized": rebuilt}, indent=2))
+    else:
+        print_report(report, settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""Incremental, parallel test runs for a module under ``modules/<name>/``.
+
+``/run-tests`` after every implementation step used to rerun the whole suite.
+This runner only runs the test files whose inputs changed since they last
+passed:
+
+- An import graph of every module under ``modules/`` is built with ``ast``
+  (absolute ``modules.x`` imports, imports relative to ``modules/`` or the
+  module dir, and relative imports), so imports of sibling modules such as
+  ``modules.common.util`` count. A test file depends on everything it reaches
+  transitively, across modules, on the ``__init__.py`` of every package it
+  imports from, and on ``conftest.py`` files in its directory and above.
+- Files outside the module that change how pytest runs every test go into every
+  fingerprint: ``conftest.py`` in ``modules/`` and each directory up to the
+  project root, and the root's pytest config (``pytest.ini``, ``pyproject.toml``,
+  ``tox.ini``, ``setup.cfg``).
+- Each test file gets a fingerprint: the content hashes of that closure plus the
+  Python version. A passing result is cached under it in
+  ``out/.cache/tests.db``, so an unchanged test file is skipped.
+- A change to any non-Python file in the module (fixtures, data) invalidates
+  every test, since imports don't show who reads it.
+- Affected test files run in parallel, one pytest process each (``unittest``
+  when pytest is not installed).
+
+Usage:
+    python .claude/scripts/module-builder/run_tests.py run auth [--workers 4]
+    python .claude/scripts/module-builder/run_tests.py run auth --full     # before /mark-complete
+    python .claude/scripts/module-builder/run_tests.py affected auth        # list, don't run
+    python .claude/scripts/module-builder/run_tests.py clear auth
+
+Exits non-zero if any test file failed.
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib.util
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    path   TEXT PRIMARY KEY,
+    size   INTEGER NOT NULL,
+    mtime  REAL NOT NULL,
+    hash   TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS test_results (
+    module       TEXT NOT NULL,
+    test_file    TEXT NOT NULL,
+    fingerprint  TEXT NOT NULL,
+    outcome      TEXT NOT NULL,
+    duration     REAL NOT NULL,
+    ran_at       REAL NOT NULL,
+    PRIMARY KEY (module, test_file)
+);
+"""
+
+DEFAULTS = {"workers": 0, "timeout_seconds": 600}
+# Read by pytest from the project root (tests run with it as cwd).
+PYTEST_CONFIGS = ("pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg")
+FAILURE_TAIL_LINES = 30
+
+
+def is_test_file(path):
+    return path.suffix == ".py" and (path.name.startswith("test_") or path.stem.endswith("_test"))
+
+
+class ModuleGraph:
+    """Files of one module, and the imports between all Python files under ``modules/``."""
+
+    def __init__(self, root, module_dir):
+        self.root = root
+        self.module_dir = module_dir
+        self.base_dir = module_dir.parent
+        self.files = sorted(
+            p for p in module_dir.rglob("*") if p.is_file() and "__pycache__" not in p.parts
+        )
+        self.sources = [p for p in self.files if p.suffix == ".py"]
+        # Other modules are indexed too: a test's closure can reach into them.
+        self.all_sources = sorted(p for p in self.base_dir.rglob("*.py") if "__pycache__" not in p.parts)
+        self.by_name = {}
+        # modules/auth/jwt.py is importable as modules.auth.jwt, auth.jwt (modules/ on
+        # sys.path) or jwt (module dir on sys.path).
+        for base in (root, self.base_dir, module_dir):
+            for path in self.all_sources:
+                if base in path.parents:
+                    parts = path.relative_to(base).with_suffix("").parts
+                    if parts[-1] == "__init__":
+                        parts = parts[:-1]
+                    if parts:
+                        self.by_name.setdefault(".".join(parts), path)
+        self.known = set(self.all_sources)
+        self.edges = {}
+
+    def imports(self, path):
+        if path not in self.edges:
+            self.edges[path] = self._imports(path)
+        return self.edges[path]
+
+    def _package(self, path):
+        return path.relative_to(self.root).with_suffix("").parts[:-1]
+
+    def _resolve(self, name):
+        """File for a dotted name plus the ``__init__.py`` of each enclosing package."""
+        found = set()
+        parts = name.split(".")
+        for end in range(1, len(parts) + 1):
+            path = self.by_name.get(".".join(parts[:end]))
+            if path is not None:
+                found.add(path)
+        return found
+
+    def _imports(self, path):
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except SyntaxError:
+            return set()
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    package = self._package(path)
+                    package = package[: len(package) - node.level + 1]
+                    base = ".".join(package + ((node.module,) if node.module else ()))
+                else:
+                    base = node.module or ""
+                names.append(base)
+                names.extend(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+        deps = set()
+        for name in names:
+            deps |= self._resolve(name)
+        deps.discard(path)
+        return deps
+
+    def closure(self, path):
+        """``path``, the conftest.py files that apply to it, and everything they import."""
+        stack = [path]
+        for directory in [path.parent, *path.parent.parents]:
+            if directory / "conftest.py" in self.known:
+                stack.append(directory / "conftest.py")
+            if directory == self.base_dir:
+                break
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            stack.extend(self.imports(current))
+        return seen
+
+    def tests(self):
+        return [p for p in self.sources if is_test_file(p)]
+
+    def data_files(self):
+        return [p for p in self.files if p.suffix != ".py"]
+
+    def outer_files(self):
+        """conftest.py files above the module, up to the root, and the root's pytest config."""
+        found = [self.root / name for name in PYTEST_CONFIGS]
+        for directory in self.module_dir.parents:
+            if directory != self.root and self.root not in directory.parents:
+                break
+            found.append(directory / "conftest.py")
+        return [p for p in found if p.is_file()]
+
+
+class TestCache:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def file_hash(self, path):
+        """Content hash, reusing the stored one while size and mtime are unchanged."""
+        stat = path.stat()
+        row = self.db.execute("SELECT * FROM file_hashes WHERE path = ?", (str(path),)).fetchone()
+        if row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+            return row["hash"]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime, digest),
+            )
+        return digest
+
+    def fingerprint(self, root, paths):
+        h = hashlib.sha256(sys.version.encode())
+        for path in sorted(paths):
+            h.update(f"{path.relative_to(root)}\0{self.file_hash(path)}\n".encode())
+        return h.hexdigest()
+
+    def last(self, module, test_file):
+        return self.db.execute(
+            "SELECT outcome, fingerprint FROM test_results WHERE module = ? AND test_file = ?", (module, test_file)
+        ).fetchone()
+
+    def record(self, module, test_file, fingerprint, outcome, duration):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO test_results VALUES (?, ?, ?, ?, ?, ?)",
+                (module, test_file, fingerprint, outcome, duration, time.time()),
+            )
+
+    def clear(self, module):
+        with self.db:
+            self.db.execute("DELETE FROM test_results WHERE module = ?", (module,))
+
+
+def plan(graph, cache, module, full=False):
+    """Return ``[(test path, fingerprint, reason)]`` to run and the number skipped."""
+    shared = graph.data_files() + graph.outer_files()
+    to_run, skipped = [], 0
+    for test in graph.tests():
+        fingerprint = cache.fingerprint(graph.root, graph.closure(test) | set(shared))
+        last = cache.last(module, str(test.relative_to(graph.root)))
+        if full:
+            to_run.append((test, fingerprint, "full run"))
+        elif last is None:
+            to_run.append((test, fingerprint, "new"))
+        elif last["outcome"] != "passed":
+            to_run.append((test, fingerprint, "failed last run"))
+        elif last["fingerprint"] != fingerprint:
+            to_run.append((test, fingerprint, "changed"))
+        else:
+            skipped += 1
+    return to_run, skipped
+
+
+def test_command(path):
+    if importlib.util.find_spec("pytest") is not None:
+        return [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", str(path)]
+    return [sys.executable, "-m", "unittest", str(path)]
+
+
+def run_one(root, path, timeout):
+    began = time.monotonic()
+    try:
+        proc = subprocess.run(test_command(path), cwd=root, capture_output=True, text=True, timeout=timeout)
+        # pytest exit 5 = no tests collected in the file; nothing failed.
+        outcome = "passed" if proc.returncode in (0, 5) else "failed"
+        output = proc.stdout + proc.stderr
+    except subprocess.TimeoutExpired as exc:
+        outcome, output = "failed", f"timed out after {timeout}s\n{exc.stdout or ''}"
+    return outcome, time.monotonic() - began, output
+
+
+def resolve_module(config, name):
+    base = config.root / config.get("modules.base_dir", "modules/")
+    candidate = Path(name)
+    module_dir = candidate if candidate.is_dir() else base / name
+    if not module_dir.is_dir():
+        raise SystemExit(f"module not found: {module_dir}")
+    module_dir = module_dir.resolve()
+    return module_dir.name, module_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="run affected tests (all with --full)")
+    p_run.add_argument("module", help="module name (modules/<name>) or path")
+    p_run.add_argument("--full", action="store_true", help="ignore cached passes and run every test file")
+    p_run.add_argument("--workers", type=int, help="parallel test processes (default: CPU count)")
+    sub.add_parser("affected", help="list test files that would run").add_argument("module")
+    sub.add_parser("clear", help="forget cached results for a module").add_argument("module")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    settings = {**DEFAULTS, **config.get("modules.tests", {})}
+    module, module_dir = resolve_module(config, args.module)
+    cache = TestCache(config.cache_dir() / "tests.db")
+    root = config.root.resolve()
+
+    if args.command == "clear":
+        cache.clear(module)
+        print(f"cleared cached results for {module}")
+        return 0
+
+    graph = ModuleGraph(root, module_dir)
+    to_run, skipped = plan(graph, cache, module, full=getattr(args, "full", False))
+
+    if args.command == "affected":
+        for test, _, reason in to_run:
+            print(f"{test.relative_to(root)}  ({reason})")
+        print(f"{len(to_run)} to run, {skipped} unchanged since they passed")
+        return 0
+
+    if not to_run:
+        print(f"{module}: all {skipped} test file(s) unchanged since they passed - nothing to run")
+        return 0
+
+    workers = args.workers or settings["workers"] or os.cpu_count() or 2
+    print(f"{module}: running {len(to_run)} test file(s) on {min(workers, len(to_run))} worker(s), "
+          f"{skipped} unchanged (cached pass)")
+    failures = []
+    began = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_one, root, test, settings["timeout_seconds"]): (test, fingerprint)
+            for test, fingerprint, _ in to_run
+        }
+        for future in as_completed(futures):
+            test, fingerprint = futures[future]
+            outcome, duration, output = future.result()
+            rel = str(test.relative_to(root))
+            cache.record(module, rel, fingerprint, outcome, duration)
+            print(f"  {'✓' if outcome == 'passed' else '✗'} {rel} ({duration:.1f}s)")
+            if outcome != "passed":
+                failures.append((rel, output))
+
+    for rel, output in failures:
+        print(f"\n--- {rel} ---")
+        print("\n".join(output.rstrip().splitlines()[-FAILURE_TAIL_LINES:]))
+    print(f"\n{len(to_run) - len(failures)} passed, {len(failures)} failed, {skipped} cached "
+          f"in {time.monotonic() - began:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""Warm pool of pre-primed builder sessions for the orchestrator.
+
+Instead of killing and recreating ``goal-builder-session`` for every task, the
+orchestrator keeps a few already-started, already-primed tmux sessions per agent
+(``goal-builder-pool-1``, ``-2``, ...). Handing a task to a builder is then an
+``acquire`` plus a ``send``.
+
+Each session is launched with a fresh ``--session-id`` (shown by ``status``).
+``release`` recycles a session with ``/clear`` (the primed context is in the
+system prompt via the prime bundle). An idle session that has died, exited
+Claude, or sat idle too long is stale and is restarted fresh with a new
+``--session-id``: after ``/clear`` the recorded conversation is no longer the
+primed baseline, so resuming it would bring back a previous ticket. A busy
+session whose Claude died is restarted with ``--resume`` instead, since its
+conversation is the task in progress, and a session stuck in ``starting`` (its
+warm process died) is restarted fresh. ``health`` claims a row before
+restarting it, so concurrent health checks never restart the same session.
+
+Usage:
+    python .claude/scripts/orchestrator/agent_pool.py warm goal-builder [--size 2]
+    python .claude/scripts/orchestrator/agent_pool.py acquire goal-builder
+    python .claude/scripts/orchestrator/agent_session.py send goal-builder "/show-issues" --session goal-builder-pool-1
+    python .claude/scripts/orchestrator/agent_pool.py release goal-builder-pool-1
+    python .claude/scripts/orchestrator/agent_pool.py status [agent]
+    python .claude/scripts/orchestrator/agent_pool.py health [agent]
+    python .claude/scripts/orchestrator/agent_pool.py drain [agent]
+
+Pool settings live in ``orchestrator.pool`` in config.yaml.
+"""
+
+import argparse
+import contextlib
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_session import (  # noqa: E402
+    AgentSession,
+    Readiness,
+    capture,
+    default_launch_command,
+    load_settings,
+    session_exists,
+    tmux,
+)
+
+DEFAULTS = {"size": 2, "max_uses": 10, "max_idle_seconds": 3600}
+
+# Process names of a running Claude. It runs as a child of run.sh, so the pane's
+# own command is the shell; look for these among the pane's descendants.
+CLAUDE_COMMANDS = {"claude", "node"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pool (
+    name        TEXT PRIMARY KEY,
+    agent       TEXT NOT NULL,
+    claude_id   TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    uses        INTEGER NOT NULL DEFAULT 0,
+    started_at  REAL NOT NULL,
+    last_used   REAL NOT NULL
+);
+"""
+
+
+class Pool:
+    def __init__(self, db_path, log_dir, readiness, settings):
+        self.db_path = db_path
+        self.log_dir = log_dir
+        self.readiness = readiness
+        self.settings = {**DEFAULTS, **(settings or {})}
+        with self._db() as db:
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _db(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def rows(self, agent=None):
+        with self._db() as db:
+            if agent:
+                return db.execute("SELECT * FROM pool WHERE agent = ? ORDER BY name", (agent,)).fetchall()
+            return db.execute("SELECT * FROM pool ORDER BY agent, name").fetchall()
+
+    def _set(self, name, **fields):
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._db() as db:
+            db.execute(f"UPDATE pool SET {assignments} WHERE name = ?", (*fields.values(), name))
+
+    def session(self, agent, name):
+        return AgentSession(agent, self.log_dir, self.readiness, name)
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self, agent, name, resume=None):
+        """Launch one pooled session and wait until it is primed and idle.
+
+        With ``resume`` (a busy session's conversation id) the conversation is
+        resumed and the session stays busy; otherwise it starts a new one.
+        """
+        claude_id = resume or str(uuid.uuid4())
+        session = self.session(agent, name)
+        with self._db() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO pool VALUES (?, ?, ?, 'starting', 0, ?, ?)",
+                (name, agent, claude_id, time.time(), time.time()),
+            )
+
+        flag = f"--resume {claude_id}" if resume else f"--session-id {claude_id}"
+        state, detail = session.wait(session.launch(default_launch_command(agent, flag)))
+        if state == "idle" and not resume and b"Context preloaded" not in session.log.read_bytes():
+            # No prime bundle in run.sh; prime the conversation the slow way once.
+            state, detail = session.wait(session.send("/prime"))
+        ready = "busy" if resume else "idle"
+        self._set(name, state=ready if state == "idle" else "stale", last_used=time.time())
+        return name, state, detail
+
+    def reserve(self, agent, size=None, count=None):
+        """Claim the lowest free ``<agent>-pool-N`` names as ``starting`` rows.
+
+        Claims ``count`` names, or as many as it takes for ``size`` sessions to be
+        idle or starting. Done in one transaction so concurrent warms don't pick
+        the same names or overshoot the pool size.
+        """
+        with self._db() as db:
+            db.execute("BEGIN IMMEDIATE")
+            rows = db.execute("SELECT name, state FROM pool WHERE agent = ?", (agent,)).fetchall()
+            if count is None:
+                count = max(size - sum(r["state"] in ("idle", "starting") for r in rows), 0)
+            taken = {r["name"] for r in rows}
+            names = [f"{agent}-pool-{n}" for n in range(1, len(taken) + count + 1)]
+            names = [name for name in names if name not in taken][:count]
+            db.executemany(
+                "INSERT INTO pool VALUES (?, ?, '', 'starting', 0, ?, ?)",
+                [(name, agent, time.time(), time.time()) for name in names],
+            )
+            db.execute("COMMIT")
+        return names
+
+    def warm(self, agent, size=None):
+        """Start new sessions in parallel until ``size`` of them are idle.
+
+        Busy sessions don't count, so warming right after an ``acquire`` adds a
+        replacement under the next free ``pool-N`` name.
+        """
+        self.health(agent)
+        missing = self.reserve(agent, size=size or self.settings["size"])
+        with ThreadPoolExecutor(max_workers=max(len(missing), 1)) as executor:
+            return list(executor.map(lambda name: self.start(agent, name), missing))
+
+    def claude_running(self, name):
+        """Whether a Claude process runs anywhere under the pane's shell."""
+        pane_pid = tmux("display-message", "-p", "-t", name, "#{pane_pid}").stdout.strip()
+        ps = subprocess.run(["ps", "-A", "-o", "pid=,ppid=,comm="], capture_output=True, text=True)
+        children = {}
+        for line in ps.stdout.splitlines():
+            parts = line.split(None, 2)
+            if len(parts) == 3:
+                children.setdefault(parts[1], []).append((parts[0], Path(parts[2].strip()).name))
+        stack = [pane_pid]
+        while stack:
+            for pid, command in children.get(stack.pop(), ()):
+                if command in CLAUDE_COMMANDS:
+                    return True
+                stack.append(pid)
+        return False
+
+    def is_stale(self, row):
+        if row["state"] == "starting":
+            # A start waits at most twice the readiness timeout (launch, then /prime).
+            if time.time() - row["started_at"] > 2 * self.readiness.timeout:
+                return "start never finished"
+            return None
+        if not session_exists(row["name"]):
+            return "tmux session gone"
+        if not self.claude_running(row["name"]):
+            return "claude exited"
+        if row["state"] == "idle" and time.time() - row["last_used"] > self.settings["max_idle_seconds"]:
+            return "idle too long"
+        if row["state"] == "idle" and not self.readiness.screen_is_idle(capture(row["name"])):
+            return "not at prompt"
+        return None
+
+    def claim(self, row):
+        """Mark a stale row ``starting`` unless another process changed it first."""
+        with self._db() as db:
+            return db.execute(
+                "UPDATE pool SET state = 'starting', started_at = ? WHERE name = ? AND state = ? AND started_at = ?",
+                (time.time(), row["name"], row["state"], row["started_at"]),
+            ).rowcount == 1
+
+    def health(self, agent=None):
+        """Restart stale sessions; returns ``[(name, reason)]`` restarted.
+
+        Busy sessions are only checked for a dead Claude and are resumed, so the
+        task in progress keeps its conversation.
+        """
+        restarted = []
+        for row in self.rows(agent):
+            reason = self.is_stale(row)
+            if not reason or not self.claim(row):
+                continue
+            tmux("kill-session", "-t", row["name"], check=False)
+            resume = row["claude_id"] if row["state"] == "busy" and row["claude_id"] else None
+            self.start(row["agent"], row["name"], resume=resume)
+            restarted.append((row["name"], reason))
+        return restarted
+
+    def acquire(self, agent):
+        """Mark a healthy idle session busy and return its name (starting one if needed)."""
+        self.health(agent)
+        with self._db() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT name FROM pool WHERE agent = ? AND state = 'idle' ORDER BY last_used LIMIT 1", (agent,)
+            ).fetchone()
+            if row:
+                db.execute("UPDATE pool SET state = 'busy', last_used = ? WHERE name = ?", (time.time(), row["name"]))
+            db.execute("COMMIT")
+        if row:
+            self._refill(agent)
+            return row["name"]
+
+        name = self.reserve(agent, count=1)[0]
+        _, state, detail = self.start(agent, name)
+        if state != "idle":
+            raise SystemExit(f"could not start {name}: {state} ({detail})")
+        self._set(name, state="busy", last_used=time.time())
+        return name
+
+    def _refill(self, agent):
+        """Warm replacements in the background so the next acquire is instant too."""
+        if sum(r["state"] == "idle" for r in self.rows(agent)) < self.settings["size"]:
+            subprocess.Popen(
+                [sys.executable, __file__, "warm", agent],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+
+    def release(self, name):
+        """Recycle a session after its ticket: ``/clear`` it, or restart fresh when worn out."""
+        row = next((r for r in self.rows() if r["name"] == name), None)
+        if row is None:
+            raise SystemExit(f"{name} is not a pooled session")
+        uses = row["uses"] + 1
+        if uses >= self.settings["max_uses"] or not session_exists(name):
+            self.start(row["agent"], name)
+            return name, "restarted"
+        session = self.session(row["agent"], name)
+        state, _ = session.wait(session.send("/clear"))
+        self._set(name, state="idle" if state == "idle" else "stale", uses=uses, last_used=time.time())
+        return name, state
+
+    def drain(self, agent=None):
+        for row in self.rows(agent):
+            tmux("kill-session", "-t", row["name"], check=False)
+            with self._db() as db:
+                db.execute("DELETE FROM pool WHERE name = ?", (row["name"],))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_warm = sub.add_parser("warm", help="start sessions until the pool is full")
+    p_warm.add_argument("agent")
+    p_warm.add_argument("--size", type=int)
+    sub.add_parser("acquire", help="take an idle primed session").add_argument("agent")
+    sub.add_parser("release", help="recycle a session after its task").add_argument("name")
+    for name, help_text in (
+        ("status", "list pooled sessions"),
+        ("health", "restart stale sessions"),
+        ("drain", "kill pooled sessions"),
+    ):
+        sub.add_parser(name, help=help_text).add_argument("agent", nargs="?")
+    args = parser.parse_args(argv)
+
+    config, overrides, log_dir = load_settings()
+    settings = config.get("orchestrator.pool", {}) if config else {}
+    pool = Pool(log_dir / "pool.db", log_dir, Readiness(overrides), settings)
+
+    if args.command == "warm":
+        for name, state, detail in pool.warm(args.agent, args.size):
+            print(f"{name}: {state}" + (f" ({detail})" if detail else ""))
+        print(f"{args.agent}: {sum(r['state'] == 'idle' for r in pool.rows(args.agent))} idle session(s)")
+    elif args.command == "acquire":
+        print(pool.acquire(args.agent))
+    elif args.command == "release":
+        name, state = pool.release(args.name)
+        print(f"{name}: {state}")
+    elif args.command == "health":
+        restarted = pool.health(args.agent)
+        for name, reason in restarted:
+            print(f"{name}: restarted ({reason})")
+        if not restarted:
+            print("all pooled sessions healthy")
+    elif args.command == "drain":
+        pool.drain(args.agent)
+    else:
+        rows = pool.rows(args.agent)
+        if not rows:
+            print("(no pooled sessions)")
+        for row in rows:
+            age = time.time() - row["last_used"]
+            print(f"{row['name']:<28} {row['state']:<8} uses={row['uses']:<3} idle={age:>5.0f}s id={row['claude_id']}")
+
+
+if __name__ == "__main__":
+    main()
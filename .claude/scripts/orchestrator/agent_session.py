@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Event-driven readiness detection for builder agents running in tmux.
+
+Replaces the fixed ``sleep 5/10/20/30`` waits. Each session's pane output is
+streamed to a log with ``tmux pipe-pane``; ``wait`` follows that log and
+returns as soon as the agent is back at its prompt, capped by a timeout.
+
+Errors are only taken from tool-error and MCP status lines (``status_patterns``),
+never from arbitrary pane text, so an issue titled "Unauthorized on login" is
+not an auth failure. A status line that also matches ``auth_patterns`` is
+reported as an auth failure once the agent is idle.
+
+Usage:
+    python .claude/scripts/orchestrator/agent_session.py launch goal-builder [--prime]
+    python .claude/scripts/orchestrator/agent_session.py send goal-builder "/show-issues"
+    python .claude/scripts/orchestrator/agent_session.py wait goal-builder [--timeout 300]
+    python .claude/scripts/orchestrator/agent_session.py status goal-builder
+
+``send``/``wait``/``status`` accept ``--session NAME`` to target a pooled
+session (see agent_pool.py) instead of ``<agent>-session``.
+
+``send`` performs the two-step send-keys (text, then C-m) and waits. After
+waiting, the last ``--lines`` lines of the pane are printed for relaying.
+
+Exit codes: 0 idle, 1 idle but errors were printed, 2 timeout, 3 MCP auth failure.
+
+Each launch/send/wait is recorded as a ``session`` telemetry span (run id
+``$MIXER_RUN_ID``, default ``orchestrator-<date>``); see telemetry.py.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import ConfigError, load_config  # noqa: E402
+from shared.telemetry import open_telemetry, tui_counts  # noqa: E402
+
+DEFAULTS = {
+    "timeout_seconds": 300,
+    "settle_seconds": 1.5,
+    "start_grace_seconds": 3.0,
+    "poll_seconds": 0.1,
+    "busy_patterns": [r"esc to interrupt"],
+    "idle_patterns": [r"\? for shortcuts", r"^[│\s]*>\s"],
+    # Tool results render under "⎿"; only errors there or MCP server status count.
+    "status_patterns": [r"^\s*⎿\s+(?:MCP )?[Ee]rror\b", r"\bMCP server\b.*\b(?:failed|error)"],
+    "auth_patterns": [r"\b401\b", r"[Uu]nauthorized", r"[Aa]uthentication (failed|required)", r"Bad credentials"],
+}
+
+EXIT_CODES = {"idle": 0, "error": 1, "timeout": 2, "auth_failure": 3}
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+ANSI = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(\x07|\x1b\\)|\x1b[()][0-9A-B]|\x1b[=>]|\r")
+
+
+def strip_ansi(text):
+    return ANSI.sub("", text)
+
+
+class Readiness:
+    """Compiled detection patterns (defaults overridden by ``orchestrator.readiness``)."""
+
+    def __init__(self, overrides=None):
+        settings = {**DEFAULTS, **(overrides or {})}
+        self.timeout = settings["timeout_seconds"]
+        self.settle = settings["settle_seconds"]
+        self.start_grace = settings["start_grace_seconds"]
+        self.poll = settings["poll_seconds"]
+        self.busy = [re.compile(p, re.M) for p in settings["busy_patterns"]]
+        self.idle = [re.compile(p, re.M) for p in settings["idle_patterns"]]
+        self.status = [re.compile(p, re.M) for p in settings["status_patterns"]]
+        self.auth = [re.compile(p, re.M) for p in settings["auth_patterns"]]
+
+    @staticmethod
+    def first_match(patterns, text):
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                line_start = text.rfind("\n", 0, match.start()) + 1
+                line_end = text.find("\n", match.end())
+                return text[line_start:line_end if line_end != -1 else None].strip()
+        return None
+
+    def status_lines(self, text):
+        """Tool-error and MCP status lines in ``text``."""
+        return [
+            line.strip() for line in text.splitlines()
+            if any(pattern.search(line) for pattern in self.status)
+        ]
+
+    def screen_is_idle(self, screen):
+        tail = "\n".join(screen.rstrip().splitlines()[-8:])
+        return self.first_match(self.busy, tail) is None and self.first_match(self.idle, tail) is not None
+
+
+def tmux(*args, check=True):
+    return subprocess.run(["tmux", *args], capture_output=True, text=True, check=check)
+
+
+def session_exists(session):
+    return tmux("has-session", "-t", session, check=False).returncode == 0
+
+
+def capture(session, lines=None):
+    args = ["capture-pane", "-t", session, "-p"]
+    if lines:
+        args += ["-S", f"-{lines}"]
+    return tmux(*args).stdout
+
+
+class AgentSession:
+    def __init__(self, agent, log_dir, readiness, name=None):
+        self.agent = agent
+        self.name = name or f"{agent}-session"
+        self.log = log_dir / f"{self.name}.log"
+        self.readiness = readiness
+
+    def stream(self):
+        """(Re)attach pipe-pane so all pane output is appended to the session log."""
+        self.log.touch()
+        tmux("pipe-pane", "-t", self.name, f"cat >> '{self.log}'")
+
+    def offset(self):
+        return self.log.stat().st_size if self.log.exists() else 0
+
+    def launch(self, command):
+        tmux("kill-session", "-t", self.name, check=False)
+        self.log.parent.mkdir(parents=True, exist_ok=True)
+        self.log.write_bytes(b"")
+        tmux("new-session", "-d", "-s", self.name, "-x", "200", "-y", "50")
+        self.stream()
+        return self.send(command)
+
+    def send(self, text):
+        """Two-step send (text, then Enter); returns the log offset before sending."""
+        if not session_exists(self.name):
+            raise SystemExit(f"tmux session {self.name} does not exist (run: launch {self.agent})")
+        start = self.offset()
+        tmux("send-keys", "-t", self.name, text)
+        tmux("send-keys", "-t", self.name, "C-m")
+        return start
+
+    def wait(self, start=None, timeout=None):
+        """Follow the log from ``start`` until the agent is idle.
+
+        Returns ``(state, detail)`` where state is one of ``EXIT_CODES``. Idle means
+        the stream has been quiet for ``settle_seconds`` and the visible pane shows
+        the prompt without a busy indicator. Until the agent has visibly started
+        working, idle is only accepted after ``start_grace_seconds``.
+        """
+        r = self.readiness
+        timeout = timeout or r.timeout
+        position = self.offset() if start is None else start
+        began = last_output = time.monotonic()
+        saw_busy = False
+        error_line = auth_line = None
+        partial = ""  # status lines can be split across reads
+
+        with open(self.log, "rb") as fh:
+            fh.seek(position)
+            while True:
+                now = time.monotonic()
+                chunk = fh.read()
+                if chunk:
+                    last_output = now
+                    text = strip_ansi(chunk.decode(errors="replace"))
+                    lines, _, partial = (partial + text).rpartition("\n")
+                    for line in r.status_lines(lines):
+                        error_line = error_line or line
+                        if auth_line is None and r.first_match(r.auth, line):
+                            auth_line = line
+                    saw_busy = saw_busy or r.first_match(r.busy, text) is not None
+
+                if not session_exists(self.name):
+                    return "error", "tmux session exited"
+                quiet = now - last_output >= r.settle
+                started = saw_busy or now - began >= r.start_grace
+                if quiet and started and r.screen_is_idle(capture(self.name)):
+                    if auth_line:
+                        return "auth_failure", auth_line
+                    return ("error", error_line) if error_line else ("idle", None)
+                if now - began >= timeout:
+                    if auth_line:
+                        return "auth_failure", auth_line
+                    return "timeout", f"no idle prompt after {timeout:.0f}s"
+                time.sleep(r.poll)
+
+
+def default_launch_command(agent, claude_args=""):
+    """Builder workspaces sit next to the orchestrator (redesign2 layout); otherwise
+    the agent is launched through mixer.sh at the repo root.
+
+    ``claude_args`` are appended and forwarded by run.sh to ``claude``.
+    """
+    workspace = (Path.cwd() / ".." / agent).resolve()
+    if (workspace / "run.sh").is_file():
+        command = f"cd '{workspace}' && ./run.sh"
+    else:
+        command = f"cd '{REPO_ROOT}' && ./mixer.sh {agent}"
+    return f"{command} {claude_args}".rstrip()
+
+
+def load_settings():
+    """Return ``(config or None, readiness overrides, session log dir)``."""
+    try:
+        config = load_config()
+        overrides, log_dir = config.get("orchestrator.readiness", {}), config.cache_dir() / "sessions"
+    except ConfigError:
+        config, overrides, log_dir = None, {}, Path(".tmp/sessions")
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return config, overrides, log_dir
+
+
+def record_span(config, session, name, start, began, state):
+    """Store one ``session`` span: wall time until idle plus tool calls/tokens seen in the log."""
+    if config is None or not config.get("telemetry.enabled", True):
+        return
+    with open(session.log, "rb") as fh:
+        fh.seek(start)
+        tool_calls, tokens = tui_counts(strip_ansi(fh.read().decode(errors="replace")))
+    run_id = os.environ.get("MIXER_RUN_ID") or f"orchestrator-{time.strftime('%Y%m%d')}"
+    open_telemetry(config).record(run_id, [{
+        "stage": session.agent,
+        "kind": "session",
+        "name": name[:80],
+        "started_at": began,
+        "duration_ms": (time.time() - began) * 1000,
+        "output_tokens": tokens,
+        "tool_calls": tool_calls,
+        "ok": int(state == "idle"),
+        "attrs": json.dumps({"state": state, "session": session.name}),
+    }])
+
+
+def report(session, state, detail, lines):
+    print(f"[{session.name}] state={state}" + (f" ({detail})" if detail else ""))
+    if lines and session_exists(session.name):
+        print("\n".join(capture(session.name).rstrip().splitlines()[-lines:]))
+    return EXIT_CODES[state]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_launch = sub.add_parser("launch", help="(re)create the agent's tmux session and wait for its prompt")
+    p_launch.add_argument("agent")
+    p_launch.add_argument("--cmd", help="launch command (default: ../<agent>/run.sh)")
+    p_launch.add_argument("--prime", action="store_true", help="send /prime once the agent is up")
+
+    p_send = sub.add_parser("send", help="send text to the agent and wait until it finishes")
+    p_send.add_argument("agent")
+    p_send.add_argument("text")
+
+    p_wait = sub.add_parser("wait", help="wait until the agent is idle")
+    p_wait.add_argument("agent")
+
+    p_status = sub.add_parser("status", help="print the agent's current state without waiting")
+    p_status.add_argument("agent")
+
+    for p in (p_launch, p_send, p_wait, p_status):
+        p.add_argument("--lines", type=int, default=50, help="pane lines to print afterwards")
+    for p in (p_launch, p_send, p_wait):
+        p.add_argument("--timeout", type=float, help="seconds before giving up")
+    for p in (p_send, p_wait, p_status):
+        p.add_argument("--session", help="tmux session name (default: <agent>-session)")
+
+    args = parser.parse_args(argv)
+    config, overrides, log_dir = load_settings()
+    session = AgentSession(args.agent, log_dir, Readiness(overrides), getattr(args, "session", None))
+
+    if args.command == "status":
+        if not session_exists(session.name):
+            print(f"[{session.name}] state=missing")
+            return 2
+        state = "idle" if session.readiness.screen_is_idle(capture(session.name)) else "busy"
+        print(f"[{session.name}] state={state}")
+        return 0 if state == "idle" else 2
+
+    began = time.time()
+    if args.command == "launch":
+        name = "launch"
+        start = session.launch(args.cmd or default_launch_command(args.agent))
+        state, detail = session.wait(start, args.timeout)
+        if state == "idle" and args.prime:
+            name = "launch + /prime"
+            state, detail = session.wait(session.send("/prime"), args.timeout)
+    elif args.command == "send":
+        name = args.text
+        session.stream()
+        start = session.send(args.text)
+        state, detail = session.wait(start, args.timeout)
+    else:
+        name = "wait"
+        session.stream()
+        start = session.offset()
+        state, detail = session.wait(start, args.timeout)
+
+    record_span(config, session, name, start, began, state)
+
+    return report(session, state, detail, args.lines)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared Python utilities for the Mixer agents (config, GitHub/Linear clients, local caches)."""
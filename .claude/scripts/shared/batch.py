@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""Headless parallel batch runs of an agent over every Linear ticket in ``todo``.
+
+Each ticket gets one ``claude -p --output-format stream-json`` worker from a
+bounded pool. Workers take a lease on their ticket in the shared mirror
+database first, so two batches (or two workers) never pick up the same goal.
+Leases are renewed from a timer thread while the worker runs and released when
+it exits.
+After taking the lease a worker re-checks the ticket's live status, so a batch
+started from a stale list doesn't re-run a ticket another batch just finished.
+
+Usage (normally via ``./mixer.sh batch``):
+    ./mixer.sh batch plan-builder [--auto-update] [--workers 4] [--limit 10]
+    ./mixer.sh batch module-builder --ticket SYS-12 --ticket SYS-14 --auto-update
+    ./mixer.sh batch plan-builder --dry-run
+
+Without ``--auto-update`` the agents follow their normal approval policy: they
+prepare drafts but make no Linear changes, and tickets stay in ``todo``.
+With it, agents run their usual transitions (plan-builder moves the goal
+todo→doing, module-builder moves plan and goal to done).
+
+Raw stream-json output per ticket is kept under ``out/.cache/runs/<run-id>/``
+(timestamped) and loaded into telemetry; see ``telemetry.py report``.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+from shared.linear_client import LinearClient, LinearError  # noqa: E402
+from shared.mirror import open_mirror, sync  # noqa: E402
+from shared.telemetry import open_telemetry, stamp, start_marker  # noqa: E402
+
+DEFAULT_AGENTS = {
+    "plan-builder": {"label": "goal", "status": "todo", "command": "/create-plan {identifier}"},
+    "module-builder": {"label": "plan", "status": "todo", "command": "/load-plan {identifier}"},
+}
+
+LEASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    identifier  TEXT PRIMARY KEY,
+    owner       TEXT NOT NULL,
+    expires_at  REAL NOT NULL
+);
+"""
+
+_print_lock = threading.Lock()
+
+
+def log(identifier, message):
+    with _print_lock:
+        print(f"[{identifier}] {message}", flush=True)
+
+
+class Leases:
+    """Ticket leases stored next to the mirror so concurrent batches see each other."""
+
+    def __init__(self, path, owner, seconds):
+        self.path = path
+        self.owner = owner
+        self.seconds = seconds
+        with self._connect() as db:
+            db.executescript(LEASE_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across worker threads.
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def acquire(self, identifier):
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+            inserted = db.execute(
+                "INSERT OR IGNORE INTO leases (identifier, owner, expires_at) VALUES (?, ?, ?)",
+                (identifier, self.owner, now + self.seconds),
+            ).rowcount
+            db.execute("COMMIT")
+        return inserted == 1
+
+    def renew(self, identifier):
+        with self._connect() as db:
+            db.execute(
+                "UPDATE leases SET expires_at = ? WHERE identifier = ? AND owner = ?",
+                (time.time() + self.seconds, identifier, self.owner),
+            )
+
+    def release(self, identifier):
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE identifier = ? AND owner = ?", (identifier, self.owner))
+
+    @contextlib.contextmanager
+    def held(self, identifier):
+        """Renew an acquired lease every third of its lifetime until the block exits, then release it.
+
+        The worker may go quiet for longer than the lease (a long tool call), so
+        renewal can't depend on its output.
+        """
+        stop = threading.Event()
+
+        def keep_alive():
+            while not stop.wait(self.seconds / 3):
+                try:
+                    self.renew(identifier)
+                except sqlite3.Error as exc:
+                    log(identifier, f"lease renewal failed, retrying: {exc}")
+
+        thread = threading.Thread(target=keep_alive, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+            self.release(identifier)
+
+
+def claude_command(config, agent, prompt):
+    agent_dir = config.root / "agents" / agent
+    system_prompt = (agent_dir / "system-prompt.md").read_text()
+    scripts = config.root / ".claude" / "scripts"
+    return [
+        "claude", "-p", prompt,
+        "--output-format", "stream-json",
+        "--verbose",
+        "--append-system-prompt", system_prompt,
+        "--dangerously-skip-permissions",
+        "--add-dir", str(config.root / ".claude" / "commands" / agent),
+        "--add-dir", str(scripts / agent),
+        "--add-dir", str(scripts / "shared"),
+    ]
+
+
+def describe_event(event):
+    """One progress line for interesting stream-json events, else None."""
+    if event.get("type") == "assistant":
+        tools = [c["name"] for c in event.get("message", {}).get("content", []) if c.get("type") == "tool_use"]
+        if tools:
+            return "→ " + ", ".join(tools)
+    if event.get("type") == "result":
+        status = "✓" if not event.get("is_error") else "✗"
+        seconds = event.get("duration_ms", 0) / 1000
+        cost = event.get("total_cost_usd")
+        extra = f", ${cost:.2f}" if cost is not None else ""
+        return f"{status} {event.get('subtype', 'finished')} in {seconds:.0f}s, {event.get('num_turns', '?')} turns{extra}"
+    return None
+
+
+def current_state(linear, identifier):
+    issue = linear.get_issue(identifier)
+    return (issue.get("state") or {}).get("name") if issue else None
+
+
+def run_ticket(config, agent, spec, identifier, leases, run_dir, auto_update, linear):
+    if not leases.acquire(identifier):
+        log(identifier, "skipped (leased by another worker)")
+        return identifier, "skipped"
+
+    prompt = spec["command"].format(identifier=identifier)
+    if auto_update:
+        prompt += " --auto-update"
+
+    outcome = "failed"
+    with leases.held(identifier):
+        # The batch's ticket list may predate another batch finishing this ticket.
+        try:
+            state = current_state(linear, identifier)
+        except (LinearError, OSError) as exc:
+            log(identifier, f"skipped (could not re-check status: {exc})")
+            return identifier, "skipped"
+        if state != config.status_name(spec["status"]):
+            log(identifier, f"skipped (now {state or 'missing'}, no longer {spec['status']})")
+            return identifier, "skipped"
+
+        log(identifier, f"start: {prompt}")
+        with open(run_dir / f"{identifier}.jsonl", "w") as raw:
+            raw.write(start_marker(agent=agent, ticket=identifier))
+            proc = subprocess.Popen(
+                claude_command(config, agent, prompt),
+                cwd=config.root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            for line in proc.stdout:
+                raw.write(stamp(line))
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    log(identifier, line.rstrip())
+                    continue
+                message = describe_event(event)
+                if message:
+                    log(identifier, message)
+                if event.get("type") == "result" and not event.get("is_error"):
+                    outcome = "done"
+            if proc.wait() != 0:
+                outcome = "failed"
+    return identifier, outcome
+
+
+def run_all(identifiers, workers, run):
+    """``{identifier: outcome}`` from ``run(identifier)`` on a worker pool.
+
+    A worker that raises only fails its own ticket; the rest of the batch runs on.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run, i): i for i in identifiers}
+        for future in as_completed(futures):
+            identifier = futures[future]
+            try:
+                results[identifier] = future.result()[1]
+            except Exception as exc:
+                log(identifier, f"failed: {exc!r}")
+                results[identifier] = "failed"
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("agent")
+    parser.add_argument("--auto-update", action="store_true", help="let agents write to Linear without approval")
+    parser.add_argument("--workers", type=int, help="parallel workers (default: batch.workers)")
+    parser.add_argument("--limit", type=int, help="process at most N tickets")
+    parser.add_argument("--ticket", action="append", help="explicit ticket identifier (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="list the tickets that would run")
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    agents = {**DEFAULT_AGENTS, **config.get("batch.agents", {})}
+    if args.agent not in agents:
+        raise SystemExit(f"batch mode supports: {', '.join(sorted(agents))}")
+    spec = agents[args.agent]
+
+    mirror = open_mirror(config)
+    sync(config, mirror, ["linear"])
+    todo = mirror.linear_issues(
+        label=config.label_name(spec["label"]), state=config.status_name(spec["status"])
+    )
+    identifiers = [t["identifier"] for t in todo]
+    if args.ticket:
+        missing = sorted(set(args.ticket) - set(identifiers))
+        if missing:
+            raise SystemExit(f"not in {spec['status']}: {', '.join(missing)}")
+        identifiers = args.ticket
+    identifiers = identifiers[: args.limit] if args.limit else identifiers
+
+    if args.dry_run or not identifiers:
+        print(f"{len(identifiers)} ticket(s) for {args.agent}: {', '.join(identifiers) or '(none)'}")
+        return 0
+
+    workers = args.workers or config.get("batch.workers", 4)
+    run_id = time.strftime("%Y%m%d-%H%M%S")
+    run_dir = config.cache_dir() / "runs" / f"{args.agent}-{run_id}"
+    run_dir.mkdir(parents=True)
+    leases = Leases(
+        mirror.path,
+        owner=f"{socket.gethostname()}:{os.getpid()}",
+        seconds=config.get("batch.lease_seconds", 900),
+    )
+    linear = LinearClient(config)
+    if not args.auto_update:
+        print("Note: without --auto-update agents only prepare drafts; Linear is not changed.")
+    print(f"Running {len(identifiers)} ticket(s) with {workers} worker(s) → {run_dir}")
+
+    results = run_all(
+        identifiers, workers,
+        lambda i: run_ticket(config, args.agent, spec, i, leases, run_dir, args.auto_update, linear),
+    )
+
+    telemetry = open_telemetry(config)
+    for raw in sorted(run_dir.glob("*.jsonl")):
+        telemetry.ingest_stream(raw, run_dir.name, args.agent)
+
+    sync(config, mirror, ["linear"])
+    print("\nSummary:")
+    for identifier in identifiers:
+        ticket = mirror.linear_issue(identifier) or {}
+        state = (ticket.get("state") or {}).get("name", "?")
+        print(f"  {identifier}: {results[identifier]} (now {state})")
+    print(f"Timing: python .claude/scripts/shared/telemetry.py report --run {run_dir.name}")
+    return 0 if all(r != "failed" for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""Replayable end-to-end benchmarks against recorded GitHub/Linear responses.
+
+A scenario is a YAML file listing shell steps and headless agent steps:
+
+    name: plan-smoke
+    cassette: plan-smoke.cassette.json     # relative to the scenario file
+    mcp_config: plan-smoke.mcp.json        # required for agent steps in ``run``
+    repeat: 3
+    steps:
+      - name: mirror-sync
+        run: python .claude/scripts/shared/mirror.py sync --full
+      - name: create-plan
+        agent: plan-builder
+        prompt: /create-plan SYS-10
+
+``record`` runs the scenario once through a recording proxy in front of the real
+APIs and saves every response to the cassette. ``run`` replays the cassette from
+a local fake server (with the recorded latency, or none) and runs the scenario
+``repeat`` times, each with a fresh cache directory so the mirror starts cold.
+Step wall times and the agents' stream-json spans go to the telemetry database
+under run id ``bench-<name>-<timestamp>``; ``compare`` diffs two runs and exits
+non-zero when a step got slower than ``bench.tolerance``.
+
+Shell steps reach the fake server through ``GITHUB_API_URL`` / ``LINEAR_API_URL``,
+which the mirror and write scripts honor. Agent steps start Claude with
+``--strict-mcp-config --mcp-config <mcp_config>``, so only the MCP servers listed
+there are available; ``{github}`` and ``{linear}`` in that file are replaced with
+the fake server's URLs. It is up to that file to point the GitHub/Linear MCP
+servers at those URLs. ``run`` refuses agent steps without an ``mcp_config``,
+since the agent would otherwise use the user's MCP servers and write to the real
+GitHub/Linear on every iteration.
+
+Usage:
+    python .claude/scripts/shared/bench.py record bench/plan-smoke.yaml
+    python .claude/scripts/shared/bench.py run bench/plan-smoke.yaml [--repeat 5] [--latency none]
+    python .claude/scripts/shared/bench.py compare plan-smoke [--baseline RUN_ID]
+    python .claude/scripts/shared/bench.py serve bench/plan-smoke.cassette.json [--port 8780]
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.batch import claude_command  # noqa: E402
+from shared.config import load_config  # noqa: E402
+from shared.github_client import DEFAULT_API_URL as GITHUB_API_URL  # noqa: E402
+from shared.linear_client import DEFAULT_API_URL as LINEAR_API_URL  # noqa: E402
+from shared.telemetry import open_telemetry, stamp, start_marker  # noqa: E402
+
+ENV_NAMES = {"github": "GITHUB_API_URL", "linear": "LINEAR_API_URL"}
+# Where ``record`` forwards to; the same env vars the clients honor.
+UPSTREAMS = {
+    "github": os.environ.get("GITHUB_API_URL", GITHUB_API_URL),
+    "linear": os.environ.get("LINEAR_API_URL", LINEAR_API_URL),
+}
+
+# Response headers worth replaying (pagination, caching, rate limits).
+KEEP_HEADERS = ("content-type", "etag", "link", "retry-after")
+KEEP_PREFIXES = ("x-ratelimit-",)
+
+DEFAULT_TOLERANCE = 0.2
+MIN_DELTA_SECONDS = 0.5
+
+BENCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bench_runs (
+    run_id      TEXT PRIMARY KEY,
+    scenario    TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    revision    TEXT,
+    repeat      INTEGER NOT NULL,
+    misses      INTEGER NOT NULL
+);
+"""
+
+
+def request_key(method, path, body):
+    """Match requests on method, path+query and (canonical JSON) body; auth is ignored."""
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True).encode()
+        except json.JSONDecodeError:
+            pass
+    return f"{method} {path} {hashlib.sha256(body or b'').hexdigest()[:16]}"
+
+
+class Cassette:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.interactions = json.loads(self.path.read_text())["interactions"] if self.path.exists() else []
+        self._lock = threading.Lock()
+        self._cursor = {}
+
+    def rewind(self):
+        """Start replaying every key from its first recorded response again."""
+        with self._lock:
+            self._cursor.clear()
+
+    def add(self, interaction):
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def next(self, key):
+        """Recorded responses for a key are replayed in order; the last one repeats."""
+        with self._lock:
+            matches = [i for i in self.interactions if i["key"] == key]
+            if not matches:
+                return None
+            position = self._cursor.get(key, 0)
+            self._cursor[key] = position + 1
+            return matches[min(position, len(matches) - 1)]
+
+    def save(self):
+        self.path.write_text(json.dumps({"interactions": self.interactions}, indent=1) + "\n")
+
+
+class FakeApiServer:
+    """Local stand-in for both APIs: ``/github/...`` and ``/linear``.
+
+    In record mode requests are forwarded upstream and stored; otherwise they are
+    answered from the cassette (unmatched requests get 501 and are counted).
+    """
+
+    def __init__(self, cassette, record=False, latency="recorded", port=0):
+        self.cassette = cassette
+        self.record = record
+        self.latency = latency
+        self.misses = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def env(self):
+        return {ENV_NAMES[api]: f"{self.base}/{api}" for api in UPSTREAMS}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        if self.record:
+            self.cassette.save()
+
+    def forward(self, api, method, rest, headers, body):
+        upstream = urlsplit(UPSTREAMS[api])
+        conn_class = http.client.HTTPSConnection if upstream.scheme == "https" else http.client.HTTPConnection
+        conn = conn_class(upstream.netloc, timeout=60)
+        headers = {k: v for k, v in headers.items() if k.lower() not in ("host", "connection", "accept-encoding")}
+        began = time.monotonic()
+        conn.request(method, upstream.path.rstrip("/") + rest, body=body, headers=headers)
+        raw = conn.getresponse()
+        data = raw.read()
+        latency_ms = (time.monotonic() - began) * 1000
+        conn.close()
+        kept = {
+            k.lower(): v.replace(UPSTREAMS[api].rstrip("/"), "{base}")
+            for k, v in raw.getheaders()
+            if k.lower() in KEEP_HEADERS or k.lower().startswith(KEEP_PREFIXES)
+        }
+        return {"status": raw.status, "headers": kept, "body": data.decode(errors="replace"), "latency_ms": latency_ms}
+
+    def respond(self, api, method, rest, headers, body):
+        key = request_key(method, f"/{api}{rest}", body)
+        if self.record:
+            interaction = {"key": key, **self.forward(api, method, rest, headers, body)}
+            self.cassette.add(interaction)
+            return interaction
+        interaction = self.cassette.next(key)
+        if interaction is None:
+            self.misses.append(key)
+            return {"status": 501, "headers": {"content-type": "application/json"},
+                    "body": json.dumps({"message": f"no recorded response for {key}"}), "latency_ms": 0}
+        if self.latency == "recorded":
+            time.sleep(interaction["latency_ms"] / 1000)
+        return interaction
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self):
+                api, _, rest = self.path.lstrip("/").partition("/")
+                if api not in UPSTREAMS:
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                reply = fake.respond(api, self.command, "/" + rest if rest else "", dict(self.headers), body)
+                data = reply["body"].encode()
+                self.send_response(reply["status"])
+                for name, value in reply["headers"].items():
+                    self.send_header(name, value.replace("{base}", f"{fake.base}/{api}"))
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _serve
+
+        return Handler
+
+
+def revision(root):
+    head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True)
+    if head.returncode != 0:
+        return None
+    dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=root).returncode != 0
+    return head.stdout.strip() + ("-dirty" if dirty else "")
+
+
+def render_mcp_config(template, server, out_dir):
+    """Write the scenario's MCP config with ``{github}``/``{linear}`` set to the fake server."""
+    text = template.read_text()
+    for api in UPSTREAMS:
+        text = text.replace("{" + api + "}", f"{server.base}/{api}")
+    path = out_dir / "mcp.json"
+    path.write_text(text)
+    return path
+
+
+def run_step(config, step, env, out_dir, mcp_config=None):
+    """Run one step; returns ``(returncode, stream-json path or None)``."""
+    if "agent" in step:
+        command = claude_command(config, step["agent"], step["prompt"])
+        if mcp_config is not None:
+            command += ["--strict-mcp-config", "--mcp-config", str(mcp_config)]
+        path = out_dir / f"{step['name']}.jsonl"
+        with open(path, "w") as raw:
+            raw.write(start_marker(agent=step["agent"], step=step["name"]))
+            proc = subprocess.Popen(
+                command,
+                cwd=config.root, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+            )
+            for line in proc.stdout:
+                raw.write(stamp(line))
+            return proc.wait(), path
+    log = out_dir / f"{step['name']}.log"
+    with open(log, "w") as fh:
+        return subprocess.run(step["run"], shell=True, cwd=config.root, env=env, stdout=fh, stderr=fh).returncode, None
+
+
+def run_scenario(config, scenario_path, repeat=None, latency="recorded", record=False):
+    scenario = yaml.safe_load(scenario_path.read_text())
+    cassette = Cassette(scenario_path.parent / scenario["cassette"])
+    if record:
+        cassette.interactions = []
+        repeat = 1
+    repeat = repeat or scenario.get("repeat", 1)
+    mcp_template = scenario_path.parent / scenario["mcp_config"] if scenario.get("mcp_config") else None
+    if mcp_template is None and any("agent" in step for step in scenario["steps"]):
+        if not record:
+            raise SystemExit(
+                f"{scenario_path}: agent steps need mcp_config (MCP servers routed to the fake server); "
+                "without it they would write to the real GitHub/Linear"
+            )
+        print("warning: no mcp_config; agent steps use your own MCP servers and their calls are not recorded")
+
+    telemetry = open_telemetry(config)
+    telemetry.db.executescript(BENCH_SCHEMA)
+    run_id = f"bench-{scenario['name']}-{time.strftime('%Y%m%d-%H%M%S')}" + ("-record" if record else "")
+    out_dir = config.cache_dir() / "bench" / run_id
+    started = time.time()
+
+    out_dir.mkdir(parents=True)
+    with FakeApiServer(cassette, record=record, latency=latency) as server:
+        mcp_config = render_mcp_config(mcp_template, server, out_dir) if mcp_template else None
+        for iteration in range(1, repeat + 1):
+            # Each iteration replays the same recorded sequence from the start.
+            cassette.rewind()
+            with tempfile.TemporaryDirectory(prefix="mixer-bench-") as cache:
+                env = {**os.environ, **server.env(), "MIXER_CACHE_DIR": cache, "MIXER_RUN_ID": run_id}
+                iteration_dir = out_dir / f"{iteration:02d}"
+                iteration_dir.mkdir()
+                for step in scenario["steps"]:
+                    began = time.time()
+                    code, stream = run_step(config, step, env, iteration_dir, mcp_config)
+                    elapsed = time.time() - began
+                    telemetry.record(run_id, [{
+                        "stage": step["name"], "kind": "step", "name": step["name"], "started_at": began,
+                        "duration_ms": elapsed * 1000, "ok": int(code == 0),
+                        "attrs": json.dumps({"iteration": iteration, "returncode": code}),
+                    }])
+                    if stream is not None:
+                        telemetry.ingest_stream(stream, run_id, step["name"])
+                    print(f"[{iteration}/{repeat}] {step['name']}: {elapsed:.1f}s" + ("" if code == 0 else f" (exit {code})"))
+
+    with telemetry.db:
+        telemetry.db.execute(
+            "INSERT OR REPLACE INTO bench_runs VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, scenario["name"], started, revision(config.root), repeat, len(server.misses)),
+        )
+    if record:
+        print(f"recorded {len(cassette.interactions)} responses -> {cassette.path}")
+    elif server.misses:
+        print(f"warning: {len(server.misses)} request(s) had no recorded response (re-record the cassette):")
+        for key in sorted(set(server.misses))[:10]:
+            print(f"  {key}")
+    return run_id
+
+
+def step_medians(telemetry, run_id):
+    durations = {}
+    for span in telemetry.spans(run_id):
+        if span["kind"] == "step":
+            durations.setdefault(span["name"], []).append(span["duration_ms"] / 1000)
+    return {name: statistics.median(values) for name, values in durations.items()}
+
+
+def compare(config, scenario, baseline=None, tolerance=None):
+    """Print per-step median wall time of the latest run vs ``baseline``; returns exit code."""
+    telemetry = open_telemetry(config)
+    telemetry.db.executescript(BENCH_SCHEMA)
+    runs = telemetry.db.execute(
+        "SELECT * FROM bench_runs WHERE scenario = ? AND run_id NOT LIKE '%-record' ORDER BY started_at DESC",
+        (scenario,),
+    ).fetchall()
+    if not runs:
+        raise SystemExit(f"no benchmark runs for {scenario}")
+    current = runs[0]
+    previous = next((r for r in runs if r["run_id"] == baseline), None) if baseline else (runs[1] if len(runs) > 1 else None)
+    if previous is None:
+        raise SystemExit(f"nothing to compare {current['run_id']} with")
+
+    tolerance = tolerance if tolerance is not None else config.get("bench.tolerance", DEFAULT_TOLERANCE)
+    old, new = step_medians(telemetry, previous["run_id"]), step_medians(telemetry, current["run_id"])
+    print(f"{previous['run_id']} ({previous['revision']}) -> {current['run_id']} ({current['revision']})")
+    regressions = 0
+    for name in new:
+        before, after = old.get(name), new[name]
+        if before is None:
+            print(f"  {name:<30} {'-':>8} {after:>8.1f}s   (new)")
+            continue
+        change = (after - before) / before if before else 0
+        slower = change > tolerance and after - before > MIN_DELTA_SECONDS
+        regressions += slower
+        print(f"  {name:<30} {before:>7.1f}s {after:>7.1f}s  {change:+6.0%}" + ("  REGRESSION" if slower else ""))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("record", help="run once against the real APIs and save the cassette").add_argument(
+        "scenario", type=Path)
+
+    p_run = sub.add_parser("run", help="replay the cassette and time the scenario")
+    p_run.add_argument("scenario", type=Path)
+    p_run.add_argument("--repeat", type=int)
+    p_run.add_argument("--latency", choices=["recorded", "none"], default="recorded")
+
+    p_compare = sub.add_parser("compare", help="compare the latest run of a scenario with an earlier one")
+    p_compare.add_argument("name")
+    p_compare.add_argument("--baseline", help="run id to compare against (default: the previous run)")
+    p_compare.add_argument("--tolerance", type=float, help="allowed slowdown per step (0.2 = 20%%)")
+
+    p_serve = sub.add_parser("serve", help="serve a cassette for manual runs")
+    p_serve.add_argument("cassette", type=Path)
+    p_serve.add_argument("--port", type=int, default=8780)
+    p_serve.add_argument("--latency", choices=["recorded", "none"], default="recorded")
+
+    args = parser.parse_args(argv)
+    config = load_config()
+
+    if args.command == "record":
+        run_scenario(config, args.scenario, record=True)
+    elif args.command == "run":
+        run_id = run_scenario(config, args.scenario, args.repeat, args.latency)
+        print(f"Timing: python .claude/scripts/shared/telemetry.py report --run {run_id} --by stage")
+    elif args.command == "compare":
+        return compare(config, args.name, args.baseline, args.tolerance)
+    elif args.command == "serve":
+        with FakeApiServer(Cassette(args.cassette), latency=args.latency, port=args.port) as server:
+            for name, value in server.env().items():
+                print(f"export {name}={value}")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Load config.yaml and .env for the Mixer scripts.
+
+Lookup order for the config file:
+1. ``MIXER_CONFIG`` environment variable
+2. ``$MIXER_ROOT/config.yaml`` (exported by mixer.sh)
+3. ``config.yaml`` or ``shared/config.yaml`` in the current directory or any parent
+   (covers the redesign2 layout where workspaces symlink ``../shared/config.yaml``)
+
+``MIXER_CACHE_DIR`` overrides ``cache.dir`` (the benchmark harness uses it to give
+each replay a fresh mirror).
+"""
+
+import os
+from pathlib import Path
+
+import yaml
+
+
+class ConfigError(Exception):
+    """Raised when config.yaml or a required credential is missing."""
+
+
+def find_config_path():
+    explicit = os.environ.get("MIXER_CONFIG")
+    if explicit:
+        return Path(explicit)
+
+    root = os.environ.get("MIXER_ROOT")
+    if root and (Path(root) / "config.yaml").is_file():
+        return Path(root) / "config.yaml"
+
+    here = Path.cwd().resolve()
+    for directory in (here, *here.parents):
+        for candidate in (directory / "config.yaml", directory / "shared" / "config.yaml"):
+            if candidate.is_file():
+                return candidate
+
+    raise ConfigError("config.yaml not found (set MIXER_CONFIG or run from the project root)")
+
+
+def load_env(path):
+    """Load KEY=value lines from a .env file without overriding the real environment."""
+    if not path.is_file():
+        return
+    for line in path.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        os.environ.setdefault(key.strip(), value.strip().strip("'\""))
+
+
+class Config:
+    """Thin accessor over the parsed config.yaml."""
+
+    def __init__(self, data, path):
+        self.data = data
+        self.path = path
+        self.root = path.resolve().parent
+
+    def get(self, dotted, default=None):
+        node = self.data
+        for part in dotted.split("."):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = node[part]
+        return node
+
+    @property
+    def github_repo(self):
+        owner, _, name = self.get("github.repo", "").partition("/")
+        if not owner or not name:
+            raise ConfigError("github.repo must look like 'owner/repo'")
+        return owner, name
+
+    @property
+    def linear_team(self):
+        return self.get("linear.team_id")
+
+    def status_name(self, key):
+        """Map a status key (draft/todo/doing/done/closed) to its Linear state name."""
+        return self.get(f"linear.tickets.statuses.{key}", key)
+
+    def label_name(self, kind):
+        """Map a ticket kind (goal/plan) to its Linear label name."""
+        return self.get(f"linear.tickets.{kind}_label", kind)
+
+    def secret(self, dotted_env_key):
+        env_name = self.get(dotted_env_key)
+        value = os.environ.get(env_name or "")
+        if not value:
+            raise ConfigError(f"{env_name} is not set (see .env)")
+        return value
+
+    def cache_dir(self):
+        path = Path(os.environ.get("MIXER_CACHE_DIR") or self.root / self.get("cache.dir", "out/.cache"))
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+
+def load_config():
+    path = find_config_path()
+    load_env(path.parent / ".env")
+    with open(path) as fh:
+        return Config(yaml.safe_load(fh) or {}, path)
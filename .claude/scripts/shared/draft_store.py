@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""Versioned, content-addressed store for goal and plan drafts.
+
+Replaces the per-step ``.tmp/goal-draft-vN.md`` copies, pairwise ``.diff`` files
+and the copied ``.tmp/archives/{GOAL-ID}/{TIMESTAMP}/`` trees. One SQLite file
+holds:
+
+- objects: zlib-compressed blobs keyed by the SHA-256 of the full text. A blob is
+  either the full text or a line delta against a base blob (delta chain).
+- versions: the history index, one row per (key, version) with the session it
+  belongs to, so "history of SYS-10" is a single query.
+
+Diffs between any two versions are computed on demand. ``pack`` rewrites chains
+longer than ``store.max_chain`` as full blobs, drops unreferenced objects and
+vacuums the file. It runs automatically from ``archive`` every
+``store.pack_every`` archives (0 turns that off).
+
+Usage:
+    python .claude/scripts/shared/draft_store.py start goal-draft
+    python .claude/scripts/shared/draft_store.py put goal-draft .tmp/goal-draft.md [--kind goal]
+    python .claude/scripts/shared/draft_store.py get goal-draft [--version 3] [-o FILE]
+    python .claude/scripts/shared/draft_store.py diff goal-draft 2 3
+    python .claude/scripts/shared/draft_store.py history SYS-10
+    python .claude/scripts/shared/draft_store.py archive goal-draft SYS-10
+    python .claude/scripts/shared/draft_store.py pack
+
+Keys are free-form: a working key such as ``goal-draft`` or ``plan-draft-SYS-10``
+while drafting, then the Linear identifier once ``archive`` files the session
+under it. ``start`` begins a new draft on a working key, discarding whatever an
+abandoned draft left there, so the first ``put`` is v1 again.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash   TEXT PRIMARY KEY,
+    base   TEXT REFERENCES objects(hash),
+    depth  INTEGER NOT NULL,
+    data   BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS versions (
+    key         TEXT NOT NULL,
+    version     INTEGER NOT NULL,
+    kind        TEXT NOT NULL,
+    session     TEXT NOT NULL,
+    hash        TEXT NOT NULL REFERENCES objects(hash),
+    created_at  REAL NOT NULL,
+    note        TEXT,
+    PRIMARY KEY (key, version)
+);
+CREATE INDEX IF NOT EXISTS versions_hash ON versions(hash);
+
+CREATE TABLE IF NOT EXISTS meta (
+    name   TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+);
+"""
+
+DEFAULT_MAX_CHAIN = 20
+DEFAULT_PACK_EVERY = 25
+# Archived history lives under Linear identifiers; ``start`` never touches those.
+IDENTIFIER = re.compile(r"^[A-Z][A-Z0-9]*-\d+$")
+
+
+class StoreError(Exception):
+    """Unknown key or version."""
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def make_delta(base_lines, lines):
+    """Encode ``lines`` as copy ranges from ``base_lines`` plus inserted lines."""
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(lines[j1:j2])
+    return ops
+
+
+def apply_delta(base_lines, ops):
+    lines = []
+    for op in ops:
+        if len(op) == 2 and all(isinstance(x, int) for x in op):
+            lines.extend(base_lines[op[0]:op[1]])
+        else:
+            lines.extend(op)
+    return lines
+
+
+class DraftStore:
+    def __init__(self, path, max_chain=DEFAULT_MAX_CHAIN, pack_every=DEFAULT_PACK_EVERY):
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.max_chain = max_chain
+        self.pack_every = pack_every
+
+    # -- objects -----------------------------------------------------------
+
+    def _object(self, hash_):
+        row = self.db.execute("SELECT * FROM objects WHERE hash = ?", (hash_,)).fetchone()
+        if row is None:
+            raise StoreError(f"missing object {hash_[:12]}")
+        return row
+
+    def read(self, hash_):
+        """Rebuild the full text of a blob by replaying its delta chain."""
+        chain = []
+        row = self._object(hash_)
+        while row["base"] is not None:
+            chain.append(row)
+            row = self._object(row["base"])
+        lines = zlib.decompress(row["data"]).decode().splitlines(keepends=True)
+        for delta in reversed(chain):
+            lines = apply_delta(lines, json.loads(zlib.decompress(delta["data"])))
+        return "".join(lines)
+
+    def write(self, text, base=None):
+        """Store ``text`` (as a delta against ``base`` when that is smaller) and return its hash."""
+        hash_ = content_hash(text)
+        if self.db.execute("SELECT 1 FROM objects WHERE hash = ?", (hash_,)).fetchone():
+            return hash_
+
+        full = zlib.compress(text.encode(), 9)
+        row = None
+        if base is not None:
+            base_row = self._object(base)
+            if base_row["depth"] < self.max_chain:
+                ops = make_delta(self.read(base).splitlines(keepends=True), text.splitlines(keepends=True))
+                delta = zlib.compress(json.dumps(ops).encode(), 9)
+                if len(delta) < len(full):
+                    row = (hash_, base, base_row["depth"] + 1, delta)
+        self.db.execute("INSERT INTO objects VALUES (?, ?, ?, ?)", row or (hash_, None, 0, full))
+        return hash_
+
+    # -- versions ----------------------------------------------------------
+
+    def latest(self, key):
+        return self.db.execute(
+            "SELECT * FROM versions WHERE key = ? ORDER BY version DESC LIMIT 1", (key,)
+        ).fetchone()
+
+    def version(self, key, number=None):
+        if number is None:
+            row = self.latest(key)
+        else:
+            row = self.db.execute("SELECT * FROM versions WHERE key = ? AND version = ?", (key, number)).fetchone()
+        if row is None:
+            raise StoreError(f"no version {number or 'latest'} of {key}")
+        return row
+
+    def start(self, key):
+        """Begin a new draft on a working key; returns how many leftover versions were dropped."""
+        if IDENTIFIER.match(key):
+            raise StoreError(f"{key} is an archived identifier, not a working key")
+        with self.db:
+            return self.db.execute("DELETE FROM versions WHERE key = ?", (key,)).rowcount
+
+    def put(self, key, text, kind="goal", note=None):
+        """Record a new version of ``key``. Unchanged content does not create a version."""
+        previous = self.latest(key)
+        if previous and previous["hash"] == content_hash(text):
+            return previous["version"], False
+        with self.db:
+            hash_ = self.write(text, previous["hash"] if previous else None)
+            number = previous["version"] + 1 if previous else 1
+            session = previous["session"] if previous else time.strftime("%Y%m%d-%H%M%S")
+            self.db.execute(
+                "INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, number, kind, session, hash_, time.time(), note),
+            )
+        return number, True
+
+    def get(self, key, number=None):
+        return self.read(self.version(key, number)["hash"])
+
+    def diff(self, key, a, b):
+        old, new = self.get(key, a), self.get(key, b)
+        return "".join(difflib.unified_diff(
+            old.splitlines(keepends=True), new.splitlines(keepends=True),
+            fromfile=f"{key} v{a}", tofile=f"{key} v{b}",
+        ))
+
+    def history(self, key):
+        return self.db.execute(
+            "SELECT version, kind, session, hash, created_at, note FROM versions WHERE key = ? ORDER BY version",
+            (key,),
+        ).fetchall()
+
+    def archive(self, key, identifier):
+        """File the working ``key``'s versions under ``identifier`` as a new session.
+
+        Versions are renumbered after the identifier's existing history; blobs
+        are shared, so nothing is copied. Returns ``(versions, session, pack
+        stats or None)``; every ``pack_every`` archives the store is packed.
+        """
+        rows = self.history(key)
+        if not rows:
+            raise StoreError(f"nothing to archive under {key}")
+        previous = self.latest(identifier)
+        offset = previous["version"] if previous else 0
+        session = time.strftime("%Y%m%d-%H%M%S")
+        with self.db:
+            for row in rows:
+                self.db.execute(
+                    "INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (identifier, offset + row["version"], row["kind"], session, row["hash"], row["created_at"], row["note"]),
+                )
+            self.db.execute("DELETE FROM versions WHERE key = ?", (key,))
+            self.db.execute(
+                "INSERT INTO meta VALUES ('archives_since_pack', 1) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + 1"
+            )
+        archives = self.db.execute("SELECT value FROM meta WHERE name = 'archives_since_pack'").fetchone()[0]
+        stats = self.pack() if self.pack_every and archives >= self.pack_every else None
+        return len(rows), session, stats
+
+    # -- maintenance -------------------------------------------------------
+
+    def pack(self):
+        """Cap delta chains, drop unreferenced objects, and vacuum. Returns stats."""
+        rebased = 0
+        with self.db:
+            for row in self.db.execute("SELECT hash FROM objects WHERE depth > ?", (self.max_chain,)).fetchall():
+                text = self.read(row["hash"])
+                self.db.execute(
+                    "UPDATE objects SET base = NULL, depth = 0, data = ? WHERE hash = ?",
+                    (zlib.compress(text.encode(), 9), row["hash"]),
+                )
+                rebased += 1
+            if rebased:
+                self._recompute_depths()
+
+            removed = 0
+            while True:
+                # Objects no version points at and no other object uses as a base.
+                cursor = self.db.execute("""
+                    DELETE FROM objects WHERE hash NOT IN (SELECT hash FROM versions)
+                    AND hash NOT IN (SELECT base FROM objects WHERE base IS NOT NULL)
+                """)
+                if cursor.rowcount == 0:
+                    break
+                removed += cursor.rowcount
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('archives_since_pack', 0)")
+        self.db.execute("VACUUM")
+        count, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM objects").fetchone()
+        return {"rebased": rebased, "removed": removed, "objects": count, "bytes": size}
+
+    def _recompute_depths(self):
+        self.db.execute("""
+            WITH RECURSIVE chain(hash, depth) AS (
+                SELECT hash, 0 FROM objects WHERE base IS NULL
+                UNION ALL
+                SELECT o.hash, chain.depth + 1 FROM objects o JOIN chain ON o.base = chain.hash
+            )
+            UPDATE objects SET depth = (SELECT depth FROM chain WHERE chain.hash = objects.hash)
+        """)
+
+
+def open_store(config):
+    return DraftStore(
+        config.cache_dir() / "drafts.db",
+        config.get("store.max_chain", DEFAULT_MAX_CHAIN),
+        config.get("store.pack_every", DEFAULT_PACK_EVERY),
+    )
+
+
+def format_pack(stats):
+    return (f"rebased {stats['rebased']}, removed {stats['removed']}; "
+            f"{stats['objects']} objects, {stats['bytes']:,} bytes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("start", help="begin a new draft on KEY, dropping leftover versions").add_argument("key")
+
+    p_put = sub.add_parser("put", help="record the file as the next version of KEY")
+    p_put.add_argument("key")
+    p_put.add_argument("file", type=Path)
+    p_put.add_argument("--kind", default="goal", choices=["goal", "plan"])
+    p_put.add_argument("--note")
+
+    p_get = sub.add_parser("get", help="print (or write) a version")
+    p_get.add_argument("key")
+    p_get.add_argument("--version", type=int)
+    p_get.add_argument("-o", "--output", type=Path)
+
+    p_diff = sub.add_parser("diff", help="unified diff between two versions")
+    p_diff.add_argument("key")
+    p_diff.add_argument("a", type=int)
+    p_diff.add_argument("b", type=int)
+
+    sub.add_parser("history", help="list versions of KEY").add_argument("key")
+
+    p_archive = sub.add_parser("archive", help="file a working key under a Linear identifier")
+    p_archive.add_argument("key")
+    p_archive.add_argument("identifier")
+
+    sub.add_parser("pack", help="compact delta chains and drop unreferenced blobs")
+
+    args = parser.parse_args(argv)
+    store = open_store(load_config())
+
+    try:
+        if args.command == "start":
+            dropped = store.start(args.key)
+            print(f"{args.key}: new draft" + (f" (dropped {dropped} leftover version(s))" if dropped else ""))
+        elif args.command == "put":
+            number, created = store.put(args.key, args.file.read_text(), args.kind, args.note)
+            print(f"{args.key} v{number}" + ("" if created else " (unchanged)"))
+            if created and number > 1:
+                print(store.diff(args.key, number - 1, number), end="")
+        elif args.command == "get":
+            text = store.get(args.key, args.version)
+            if args.output:
+                args.output.write_text(text)
+            else:
+                print(text, end="")
+        elif args.command == "diff":
+            print(store.diff(args.key, args.a, args.b) or "(no changes)", end="\n")
+        elif args.command == "history":
+            rows = store.history(args.key)
+            if not rows:
+                print(f"(no history for {args.key})")
+            session = None
+            for row in rows:
+                if row["session"] != session:
+                    session = row["session"]
+                    print(f"session {session}")
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["created_at"]))
+                note = f"  {row['note']}" if row["note"] else ""
+                print(f"  v{row['version']:<3} {row['kind']:<5} {when}  {row['hash'][:12]}{note}")
+        elif args.command == "archive":
+            count, session, stats = store.archive(args.key, args.identifier)
+            print(f"archived {count} version(s) of {args.key} under {args.identifier} (session {session})")
+            if stats:
+                print(f"packed: {format_pack(stats)}")
+        elif args.command == "pack":
+            print(format_pack(store.pack()))
+    except StoreError as exc:
+        raise SystemExit(str(exc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""GitHub REST client used by the shared scripts."""
+
+import os
+import re
+
+from .transport import JsonHttp
+
+DEFAULT_API_URL = "https://api.github.com"
+
+
+class GitHubClient:
+    def __init__(self, config):
+        self.owner, self.repo = config.github_repo
+        token = config.secret("github.auth.token_env")
+        self.http = JsonHttp(
+            os.environ.get("GITHUB_API_URL", DEFAULT_API_URL),
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+        )
+
+    @property
+    def issues_path(self):
+        return f"/repos/{self.owner}/{self.repo}/issues"
+
+    def list_issues_since(self, since=None, etag=None):
+        """Return ``(issues, etag)`` for every issue updated at or after ``since``.
+
+        Passing the ETag from the previous sync makes an unchanged repository cost a
+        single 304 response (which GitHub does not count against the rate limit).
+        Returns ``(None, etag)`` when nothing changed. Pull requests are skipped.
+        """
+        params = {"state": "all", "per_page": 100, "sort": "updated", "direction": "asc"}
+        if since:
+            params["since"] = since
+        headers = {"If-None-Match": etag} if etag else None
+
+        response = self.http.request("GET", self.issues_path, params=params, headers=headers)
+        if response.status == 304:
+            return None, etag
+        first_etag = response.header("etag")
+
+        issues = []
+        while True:
+            issues.extend(i for i in response.json() if "pull_request" not in i)
+            next_url = _next_link(response.header("link"))
+            if not next_url:
+                break
+            response = self.http.request("GET", next_url)
+        return issues, first_etag
+
+    def comment(self, number, body):
+        return self.http.request("POST", f"{self.issues_path}/{number}/comments", body={"body": body}).json()
+
+    def close_issue(self, number, reason="completed"):
+        return self.http.request(
+            "PATCH", f"{self.issues_path}/{number}", body={"state": "closed", "state_reason": reason}
+        ).json()
+
+
+def _next_link(link_header):
+    if not link_header:
+        return None
+    match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
+    return match.group(1) if match else None
@@ -0,0 +1,153 @@
+"""Linear GraphQL client used by the shared scripts."""
+
+import os
+
+from .transport import HttpError, JsonHttp
+
+DEFAULT_API_URL = "https://api.linear.app/graphql"
+
+ISSUE_FIELDS = """
+    id identifier title description updatedAt archivedAt trashed
+    state { name }
+    labels { nodes { name } }
+    parent { identifier }
+"""
+
+ISSUES_QUERY = """
+query MixerIssues($filter: IssueFilter, $after: String) {
+  issues(filter: $filter, first: 100, after: $after, orderBy: updatedAt, includeArchived: true) {
+    nodes { %s }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+""" % ISSUE_FIELDS
+
+TEAM_QUERY = """
+query MixerTeam($key: String!) {
+  teams(filter: { key: { eq: $key } }) {
+    nodes {
+      id key
+      labels { nodes { id name } }
+      states { nodes { id name } }
+    }
+  }
+}
+"""
+
+
+ISSUE_RESULT = "success issue { id identifier url state { name } }"
+
+ISSUE_BY_ID_QUERY = """
+query MixerIssue($id: String!) {
+  issue(id: $id) { id identifier url state { name } }
+}
+"""
+
+
+class LinearError(Exception):
+    """GraphQL-level error returned by Linear (``status`` is set for HTTP failures)."""
+
+    def __init__(self, message, status=None, response=None):
+        super().__init__(message)
+        self.status = status
+        self.response = response
+
+
+class LinearClient:
+    def __init__(self, config):
+        self.team_key = config.linear_team
+        api_key = config.secret("linear.auth.api_key_env")
+        self.http = JsonHttp(
+            os.environ.get("LINEAR_API_URL", DEFAULT_API_URL),
+            headers={"Authorization": api_key},
+        )
+
+    def _post(self, query, variables):
+        try:
+            response = self.http.request("POST", "", body={"query": query, "variables": variables or {}})
+        except HttpError as exc:
+            raise LinearError(str(exc), exc.status, exc.response) from exc
+        return response.json()
+
+    def query(self, query, variables=None):
+        payload = self._post(query, variables)
+        if payload.get("errors"):
+            raise LinearError("; ".join(e.get("message", "?") for e in payload["errors"]))
+        return payload["data"]
+
+    def get_issue(self, issue_id):
+        """Return ``{id, identifier, url, state}`` or None if the issue does not exist."""
+        try:
+            return self.query(ISSUE_BY_ID_QUERY, {"id": issue_id})["issue"]
+        except LinearError as exc:
+            if exc.status is not None:
+                raise
+            return None
+
+    def mutate_batch(self, mutations):
+        """Run several issue mutations as one aliased GraphQL request.
+
+        ``mutations`` is a list of ``(alias, kind, id, input)`` where kind is
+        ``"create"`` (id ignored) or ``"update"``. Returns ``{alias: issue}`` for
+        the ones that succeeded and ``{alias: LinearError}`` for the ones that
+        failed; a failure of the whole request raises.
+        """
+        params, fields, variables = [], [], {}
+        for alias, kind, issue_id, issue_input in mutations:
+            variables[f"{alias}_input"] = issue_input
+            if kind == "create":
+                params.append(f"${alias}_input: IssueCreateInput!")
+                fields.append(f"{alias}: issueCreate(input: ${alias}_input) {{ {ISSUE_RESULT} }}")
+            else:
+                params.append(f"${alias}_id: String!, ${alias}_input: IssueUpdateInput!")
+                variables[f"{alias}_id"] = issue_id
+                fields.append(f"{alias}: issueUpdate(id: ${alias}_id, input: ${alias}_input) {{ {ISSUE_RESULT} }}")
+        query = "mutation MixerBatch(%s) {\n  %s\n}" % (", ".join(params), "\n  ".join(fields))
+
+        payload = self._post(query, variables)
+        data = payload.get("data") or {}
+        failed = {}
+        for error in payload.get("errors") or []:
+            path = error.get("path") or []
+            if not path:
+                raise LinearError(error.get("message", "?"))
+            failed[path[0]] = LinearError(error.get("message", "?"))
+
+        results = {}
+        for alias, *_ in mutations:
+            outcome = data.get(alias)
+            if alias in failed or not outcome or not outcome.get("success"):
+                results[alias] = failed.get(alias, LinearError(f"{alias}: mutation was not successful"))
+            else:
+                results[alias] = outcome["issue"]
+        return results
+
+    def list_issues_since(self, updated_after=None):
+        """Return every team issue updated strictly after ``updated_after`` (ISO timestamp).
+
+        Archived and trashed issues are included (with ``archivedAt`` / ``trashed``
+        set) so a mirror can drop them.
+        """
+        issue_filter = {"team": {"key": {"eq": self.team_key}}}
+        if updated_after:
+            issue_filter["updatedAt"] = {"gt": updated_after}
+
+        issues, after = [], None
+        while True:
+            page = self.query(ISSUES_QUERY, {"filter": issue_filter, "after": after})["issues"]
+            issues.extend(page["nodes"])
+            if not page["pageInfo"]["hasNextPage"]:
+                return issues
+            after = page["pageInfo"]["endCursor"]
+
+    def team_lookups(self):
+        """Return ``{"team": {key: id}, "label": {name: id}, "state": {name: id}}``."""
+        teams = self.query(TEAM_QUERY, {"key": self.team_key})["teams"]["nodes"]
+        if not teams:
+            raise LinearError(f"Linear team '{self.team_key}' not found")
+        team = teams[0]
+        return {
+            "team": {team["key"]: team["id"]},
+            "label": {n["name"]: n["id"] for n in team["labels"]["nodes"]},
+            "state": {n["name"]: n["id"] for n in team["states"]["nodes"]},
+        }
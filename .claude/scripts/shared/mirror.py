@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""Local SQLite mirror of GitHub issues and Linear tickets.
+
+The show-* commands answer from this index instead of calling
+``mcp__github__list_issues`` / ``mcp__linear__list_issues`` every time.
+Syncs are incremental: GitHub uses the ``since`` cursor plus the ETag of the
+last listing (an unchanged repo costs one 304), Linear uses an ``updatedAt``
+cursor; issues archived or trashed in Linear are dropped from the mirror.
+Label/state/team name→ID lookups for ``create_issue`` are cached too and
+reloaded from Linear when a name is missing (or with ``--refresh-lookups``).
+
+Usage:
+    python .claude/scripts/shared/mirror.py sync [--github | --linear] [--full]
+    python .claude/scripts/shared/mirror.py issues [--state open|closed|all]
+    python .claude/scripts/shared/mirror.py tickets [--label goal] [--status draft] [--parent SYS-10]
+    python .claude/scripts/shared/mirror.py ticket SYS-10
+    python .claude/scripts/shared/mirror.py ids [--label goal] [--status draft]
+
+Add ``--fresh`` to any query to run an incremental sync first when the last one
+is older than ``cache.max_age_seconds``. Add ``--json`` for machine output.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS github_issues (
+    number      INTEGER PRIMARY KEY,
+    title       TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    labels      TEXT NOT NULL,
+    body        TEXT,
+    updated_at  TEXT NOT NULL,
+    raw         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS github_issues_state ON github_issues(state);
+
+CREATE TABLE IF NOT EXISTS linear_issues (
+    id          TEXT PRIMARY KEY,
+    identifier  TEXT NOT NULL UNIQUE,
+    title       TEXT NOT NULL,
+    description TEXT,
+    state       TEXT,
+    labels      TEXT NOT NULL,
+    parent      TEXT,
+    updated_at  TEXT NOT NULL,
+    raw         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS linear_issues_state ON linear_issues(state);
+
+CREATE TABLE IF NOT EXISTS lookups (
+    kind  TEXT NOT NULL,
+    name  TEXT NOT NULL,
+    id    TEXT NOT NULL,
+    PRIMARY KEY (kind, name)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    source     TEXT PRIMARY KEY,
+    cursor     TEXT,
+    etag       TEXT,
+    synced_at  REAL
+);
+"""
+
+
+class Mirror:
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    # -- sync bookkeeping -------------------------------------------------
+
+    def sync_state(self, source):
+        row = self.db.execute("SELECT * FROM sync_state WHERE source = ?", (source,)).fetchone()
+        return dict(row) if row else {"source": source, "cursor": None, "etag": None, "synced_at": None}
+
+    def set_sync_state(self, source, cursor, etag=None):
+        self.db.execute(
+            "INSERT OR REPLACE INTO sync_state (source, cursor, etag, synced_at) VALUES (?, ?, ?, ?)",
+            (source, cursor, etag, time.time()),
+        )
+
+    def reset(self, source):
+        table = {"github": "github_issues", "linear": "linear_issues"}[source]
+        with self.db:
+            self.db.execute(f"DELETE FROM {table}")
+            self.db.execute("DELETE FROM sync_state WHERE source = ?", (source,))
+
+    # -- writes ------------------------------------------------------------
+
+    def upsert_github(self, issues):
+        self.db.executemany(
+            "INSERT OR REPLACE INTO github_issues VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    i["number"],
+                    i["title"],
+                    i["state"],
+                    json.dumps([label["name"] for label in i.get("labels", [])]),
+                    i.get("body"),
+                    i["updated_at"],
+                    json.dumps(i),
+                )
+                for i in issues
+            ],
+        )
+
+    def upsert_linear(self, issues):
+        """Store live issues and drop archived or trashed ones."""
+        gone = [i for i in issues if i.get("archivedAt") or i.get("trashed")]
+        issues = [i for i in issues if not (i.get("archivedAt") or i.get("trashed"))]
+        self.db.executemany("DELETE FROM linear_issues WHERE id = ?", [(i["id"],) for i in gone])
+        self.db.executemany(
+            "INSERT OR REPLACE INTO linear_issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    i["id"],
+                    i["identifier"],
+                    i["title"],
+                    i.get("description"),
+                    (i.get("state") or {}).get("name"),
+                    json.dumps([n["name"] for n in (i.get("labels") or {}).get("nodes", [])]),
+                    (i.get("parent") or {}).get("identifier"),
+                    i["updatedAt"],
+                    json.dumps(i),
+                )
+                for i in issues
+            ],
+        )
+
+    def set_lookups(self, lookups):
+        with self.db:
+            self.db.execute("DELETE FROM lookups")
+            self.db.executemany(
+                "INSERT INTO lookups (kind, name, id) VALUES (?, ?, ?)",
+                [(kind, name, id_) for kind, names in lookups.items() for name, id_ in names.items()],
+            )
+
+    # -- queries -----------------------------------------------------------
+
+    def github_issues(self, state="open", body=False):
+        sql = "SELECT number, title, state, labels, updated_at" + (", body" if body else "") + " FROM github_issues"
+        args = ()
+        if state != "all":
+            sql += " WHERE state = ?"
+            args = (state,)
+        rows = self.db.execute(sql + " ORDER BY number", args).fetchall()
+        return [{**dict(r), "labels": json.loads(r["labels"])} for r in rows]
+
+    def linear_issues(self, label=None, state=None, parent=None):
+        clauses, args = [], []
+        if label:
+            clauses.append("EXISTS (SELECT 1 FROM json_each(labels) WHERE value = ?)")
+            args.append(label)
+        if state:
+            clauses.append("state = ?")
+            args.append(state)
+        if parent:
+            clauses.append("parent = ?")
+            args.append(parent)
+        sql = "SELECT identifier, title, state, labels, parent, updated_at FROM linear_issues"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = self.db.execute(sql + " ORDER BY updated_at DESC", args).fetchall()
+        return [{**dict(r), "labels": json.loads(r["labels"])} for r in rows]
+
+    def linear_issue(self, identifier):
+        row = self.db.execute(
+            "SELECT raw FROM linear_issues WHERE identifier = ? OR id = ?", (identifier, identifier)
+        ).fetchone()
+        return json.loads(row["raw"]) if row else None
+
+    def lookup(self, kind, name):
+        row = self.db.execute("SELECT id FROM lookups WHERE kind = ? AND name = ?", (kind, name)).fetchone()
+        return row["id"] if row else None
+
+
+def open_mirror(config):
+    return Mirror(config.cache_dir() / "mirror.db")
+
+
+def sync_github(mirror, client, full=False):
+    """Pull GitHub issues changed since the last sync. Returns the number updated."""
+    if full:
+        mirror.reset("github")
+    state = mirror.sync_state("github")
+    issues, etag = client.list_issues_since(state["cursor"], state["etag"])
+    with mirror.db:
+        if issues is None:
+            mirror.set_sync_state("github", state["cursor"], etag)
+            return 0
+        mirror.upsert_github(issues)
+        cursor = max([i["updated_at"] for i in issues] + [state["cursor"] or ""]) or None
+        mirror.set_sync_state("github", cursor, etag)
+    return len(issues)
+
+
+def sync_linear(mirror, client, full=False, refresh_lookups=False):
+    """Pull Linear tickets changed since the last sync. Returns the number updated."""
+    if full:
+        mirror.reset("linear")
+    if full or refresh_lookups or mirror.lookup("team", client.team_key) is None:
+        mirror.set_lookups(client.team_lookups())
+    state = mirror.sync_state("linear")
+    issues = client.list_issues_since(state["cursor"])
+    with mirror.db:
+        mirror.upsert_linear(issues)
+        cursor = max([i["updatedAt"] for i in issues] + [state["cursor"] or ""]) or None
+        mirror.set_sync_state("linear", cursor)
+    return len(issues)
+
+
+def sync(config, mirror, sources=("github", "linear"), full=False, refresh_lookups=False):
+    counts = {}
+    if "github" in sources:
+        from shared.github_client import GitHubClient
+
+        counts["github"] = sync_github(mirror, GitHubClient(config), full)
+    if "linear" in sources:
+        from shared.linear_client import LinearClient
+
+        counts["linear"] = sync_linear(mirror, LinearClient(config), full, refresh_lookups)
+    return counts
+
+
+def sync_if_stale(config, mirror, sources):
+    max_age = config.get("cache.max_age_seconds", 60)
+    stale = [
+        s for s in sources
+        if (mirror.sync_state(s)["synced_at"] or 0) < time.time() - max_age
+    ]
+    if stale:
+        sync(config, mirror, stale)
+
+
+def reload_lookups(config, mirror):
+    """Refetch the team's label/state IDs, e.g. after a cache miss on a newly added label."""
+    from shared.linear_client import LinearClient
+
+    mirror.set_lookups(LinearClient(config).team_lookups())
+
+
+def create_ids(config, mirror, label=None, status=None):
+    """Resolve the teamId/labelIds/stateId that ``create_issue`` needs from the cache.
+
+    A miss reloads the lookups from Linear once before giving up.
+    """
+    def resolve():
+        ids = {"teamId": mirror.lookup("team", config.linear_team)}
+        if label:
+            ids["labelIds"] = [mirror.lookup("label", config.label_name(label))]
+        if status:
+            ids["stateId"] = mirror.lookup("state", config.status_name(status))
+        return ids, [k for k, v in ids.items() if v is None or v == [None]]
+
+    ids, missing = resolve()
+    if missing:
+        reload_lookups(config, mirror)
+        ids, missing = resolve()
+    if missing:
+        raise SystemExit(
+            f"Not in Linear team {config.linear_team}: {', '.join(missing)} "
+            "(check linear.team_id and the label/status names in config.yaml)"
+        )
+    return ids
+
+
+def _print_table(rows, columns):
+    if not rows:
+        print("(none)")
+        return
+    print("| " + " | ".join(columns) + " |")
+    print("|" + "|".join("---" for _ in columns) + "|")
+    for row in rows:
+        cells = [", ".join(v) if isinstance(v, list) else str(v if v is not None else "") for v in (row[c] for c in columns)]
+        print("| " + " | ".join(cells) + " |")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_sync = sub.add_parser("sync", help="incrementally sync from GitHub and/or Linear")
+    p_sync.add_argument("--github", action="store_true")
+    p_sync.add_argument("--linear", action="store_true")
+    p_sync.add_argument("--full", action="store_true", help="drop local rows and resync everything")
+    p_sync.add_argument("--refresh-lookups", action="store_true", help="reload label/state IDs")
+
+    p_issues = sub.add_parser("issues", help="list mirrored GitHub issues")
+    p_issues.add_argument("--state", default="open", choices=["open", "closed", "all"])
+
+    p_tickets = sub.add_parser("tickets", help="list mirrored Linear tickets")
+    p_tickets.add_argument("--label", help="ticket kind from config (goal, plan)")
+    p_tickets.add_argument("--status", help="status key from config (draft, todo, doing, done, closed)")
+    p_tickets.add_argument("--parent", help="parent identifier, e.g. SYS-10")
+
+    p_ticket = sub.add_parser("ticket", help="show one mirrored Linear ticket as JSON")
+    p_ticket.add_argument("identifier")
+
+    p_ids = sub.add_parser("ids", help="print cached teamId/labelIds/stateId for create_issue")
+    p_ids.add_argument("--label")
+    p_ids.add_argument("--status")
+
+    for p in (p_issues, p_tickets, p_ticket, p_ids):
+        p.add_argument("--fresh", action="store_true", help="sync first if the mirror is stale")
+    for p in (p_issues, p_tickets):
+        p.add_argument("--json", action="store_true")
+
+    args = parser.parse_args(argv)
+    config = load_config()
+    mirror = open_mirror(config)
+
+    if args.command == "sync":
+        sources = [s for s in ("github", "linear") if getattr(args, s)] or ["github", "linear"]
+        counts = sync(config, mirror, sources, args.full, args.refresh_lookups)
+        for source, count in counts.items():
+            print(f"{source}: {count} updated")
+        return
+
+    if args.fresh:
+        sync_if_stale(config, mirror, ["github"] if args.command == "issues" else ["linear"])
+
+    if args.command == "issues":
+        rows = mirror.github_issues(args.state)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            _print_table(rows, ["number", "title", "state", "labels"])
+    elif args.command == "tickets":
+        rows = mirror.linear_issues(
+            label=config.label_name(args.label) if args.label else None,
+            state=config.status_name(args.status) if args.status else None,
+            parent=args.parent,
+        )
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            _print_table(rows, ["identifier", "title", "state", "parent"])
+    elif args.command == "ticket":
+        issue = mirror.linear_issue(args.identifier)
+        if issue is None:
+            raise SystemExit(f"{args.identifier} not in mirror (run: mirror.py sync --linear)")
+        print(json.dumps(issue, indent=2))
+    elif args.command == "ids":
+        print(json.dumps(create_ids(config, mirror, args.label, args.status), indent=2))
+
+
+if __name__ == "__main__":
+    main()
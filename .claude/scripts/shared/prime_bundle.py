@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Compile an agent's /prime context into one content-hashed bundle.
+
+``/prime`` reads its files one at a time over several tool round trips. This
+script concatenates the same files, in the same order, into a single Markdown
+bundle that ``run.sh`` passes to ``claude --append-system-prompt``. Startup then
+costs one file read, and the bundle is a stable, cache-friendly prompt prefix.
+
+The source list comes from the numbered list under ``## Read`` in the
+workspace's ``.claude/commands/prime.md`` (the single source of truth for what
+/prime loads), falling back to the documented prime set per agent.
+
+Bundles live in ``<workspace>/out/.cache/prime/`` and are keyed by the hash of
+all sources. A rebuild only happens when a source file's content changes.
+
+Usage:
+    python .claude/scripts/shared/prime_bundle.py build [WORKSPACE] [--force]
+    python .claude/scripts/shared/prime_bundle.py report [WORKSPACE]
+
+``build`` prints the bundle path on stdout (for run.sh) and a size report on
+stderr when it rebuilds. If any source is missing it prints no path and exits
+non-zero: the bundle would claim files are loaded that aren't, so run.sh falls
+back to sending /prime instead.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+BUNDLE_FORMAT = 1
+
+DEFAULT_SOURCES = {
+    "goal-builder": [
+        "prompts/system.md",
+        "prompts/developer.md",
+        "prompts/user.md",
+        ".claude/skills/SKILL.md",
+        ".claude/skills/WORKFLOW.md",
+        ".claude/skills/TEMPLATES.md",
+        "adapters/transforms/gh_to_linear.md",
+    ],
+    "orchestrator": [
+        "prompts/system.md",
+        "prompts/developer.md",
+        "prompts/user.md",
+        ".claude/skills/SKILL.md",
+        ".claude/skills/WORKFLOW.md",
+        ".claude/AGENT-INTERACTION-CRITICAL-RULES.md",
+        ".claude/commands/run-agent.md",
+    ],
+}
+
+READ_ITEM = re.compile(r"^\s*\d+\.\s+`([^`]+)`")
+
+
+def prime_sources(workspace):
+    """Ordered source paths (relative to the workspace) that /prime loads."""
+    prime = workspace / ".claude" / "commands" / "prime.md"
+    if prime.is_file():
+        sources, in_read = [], False
+        for line in prime.read_text().splitlines():
+            if line.startswith("## "):
+                in_read = line.strip().lower() == "## read"
+                continue
+            match = READ_ITEM.match(line) if in_read else None
+            if match:
+                sources.append(match.group(1))
+        if sources:
+            return sources
+    return DEFAULT_SOURCES.get(workspace.name, ["prompts/system.md", "prompts/developer.md", "prompts/user.md"])
+
+
+def approx_tokens(text):
+    # ~4 characters per token for English Markdown; good enough for budgeting.
+    return (len(text) + 3) // 4
+
+
+class Bundler:
+    def __init__(self, workspace):
+        self.workspace = workspace.resolve()
+        self.agent = self.workspace.name
+        self.cache = self.workspace / "out" / ".cache" / "prime"
+        self.manifest_path = self.cache / "manifest.json"
+
+    def _manifest(self):
+        if self.manifest_path.is_file():
+            return json.loads(self.manifest_path.read_text())
+        return {"files": {}}
+
+    def _hash_sources(self, sources, previous):
+        """Return per-file entries, reusing recorded hashes when size and mtime match."""
+        entries = []
+        for rel in sources:
+            path = self.workspace / rel
+            if not path.is_file():
+                entries.append({"path": rel, "missing": True})
+                continue
+            stat = path.stat()
+            known = previous.get(rel)
+            if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+                sha = known["sha256"]
+            else:
+                sha = hashlib.sha256(path.read_bytes()).hexdigest()
+            entries.append({"path": rel, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha})
+        return entries
+
+    @staticmethod
+    def bundle_key(entries):
+        digest = hashlib.sha256(f"format={BUNDLE_FORMAT}\n".encode())
+        for entry in entries:
+            digest.update(f"{entry['path']}\0{entry.get('sha256', 'missing')}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def render(self, entries):
+        parts = [
+            f"# {self.agent} context (precompiled /prime bundle)\n\n"
+            "The files below are already loaded; /prime does not need to read them again.\n"
+        ]
+        for entry in entries:
+            if entry.get("missing"):
+                continue
+            text = (self.workspace / entry["path"]).read_text()
+            parts.append(f"\n---\n\n<!-- SOURCE: {entry['path']} -->\n\n{text.rstrip()}\n")
+        return "".join(parts)
+
+    def build(self, force=False):
+        """Return ``(bundle_path, rebuilt, report)``."""
+        manifest = self._manifest()
+        entries = self._hash_sources(prime_sources(self.workspace), manifest["files"])
+        key = self.bundle_key(entries)
+        bundle = self.cache / f"{self.agent}-{key}.md"
+
+        if bundle.is_file() and not force and manifest.get("key") == key:
+            return bundle, False, manifest["report"]
+
+        self.cache.mkdir(parents=True, exist_ok=True)
+        text = self.render(entries)
+        bundle.write_text(text)
+        for stale in self.cache.glob(f"{self.agent}-*.md"):
+            if stale != bundle:
+                stale.unlink()
+
+        report = {
+            "key": key,
+            "tokens": approx_tokens(text),
+            "lines": text.count("\n"),
+            "sources": [
+                {
+                    "path": e["path"],
+                    "missing": e.get("missing", False),
+                    "tokens": 0 if e.get("missing") else approx_tokens((self.workspace / e["path"]).read_text()),
+                }
+                for e in entries
+            ],
+        }
+        self.manifest_path.write_text(json.dumps({
+            "key": key,
+            "files": {e["path"]: e for e in entries if not e.get("missing")},
+            "report": report,
+        }, indent=2))
+        return bundle, True, report
+
+
+def format_report(agent, report):
+    lines = [f"{agent} prime bundle {report['key']}: ~{report['tokens']:,} tokens, {report['lines']:,} lines"]
+    for source in report["sources"]:
+        size = "MISSING" if source["missing"] else f"~{source['tokens']:,} tokens"
+        lines.append(f"  {source['path']:<48} {size}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("command", choices=["build", "report"])
+    parser.add_argument("workspace", nargs="?", default=".", type=Path)
+    parser.add_argument("--force", action="store_true", help="rebuild even if sources are unchanged")
+    args = parser.parse_args(argv)
+
+    bundler = Bundler(args.workspace)
+    bundle, rebuilt, report = bundler.build(force=args.force)
+    missing = [s["path"] for s in report["sources"] if s["missing"]]
+    if args.command == "report":
+        print(format_report(bundler.agent, report))
+        print(f"bundle: {bundle}" + (" (not used, sources missing)" if missing else ""))
+    elif missing:
+        print(format_report(bundler.agent, report), file=sys.stderr)
+        raise SystemExit(f"prime bundle not used, missing: {', '.join(missing)}")
+    else:
+        if rebuilt:
+            print(format_report(bundler.agent, report), file=sys.stderr)
+        print(bundle)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Async token-bucket limiter that also honors API rate-limit response headers."""
+
+import asyncio
+import threading
+import time
+
+# (remaining header, reset header, reset unit in seconds)
+RATE_LIMIT_HEADERS = [
+    ("x-ratelimit-remaining", "x-ratelimit-reset", 1),                    # GitHub: epoch seconds
+    ("x-ratelimit-requests-remaining", "x-ratelimit-requests-reset", 0.001),  # Linear: epoch ms
+]
+
+
+class TokenBucket:
+    """Allow ``per_minute`` requests on average with bursts of up to ``burst``.
+
+    ``observe`` is fed every HTTP response (from any thread). When the server
+    reports no remaining quota, or sends ``Retry-After``, all callers of
+    ``acquire`` are held until the reported reset time.
+    """
+
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _take(self):
+        """Take a token if possible; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + max(seconds, 0))
+
+    def observe(self, response):
+        retry_after = response.header("retry-after")
+        if retry_after:
+            try:
+                self.block_for(float(retry_after))
+            except ValueError:
+                pass
+            return
+        for remaining_name, reset_name, unit in RATE_LIMIT_HEADERS:
+            remaining, reset = response.header(remaining_name), response.header(reset_name)
+            if remaining is not None and reset is not None and int(remaining) == 0:
+                self.block_for(float(reset) * unit - time.time())
+                return
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Per-stage timing spans for Mixer runs, stored in ``out/.cache/telemetry.db``.
+
+Sources:
+
+- stream-json output of headless runs (``batch.py``, ``bench.py``). Both stamp
+  every line with a ``_ts`` receive time and write a ``mixer/start`` marker first,
+  which yields spans for CLI startup, each model turn (with token usage) and each
+  tool call (``mcp`` for MCP tools). The final ``result`` event gives the run span
+  with API time, turns and cost. Unstamped files still give the run span.
+- orchestrator sessions: ``agent_session.py`` records one ``session`` span per
+  launch/send/wait (wall time until idle, so it includes the settle wait), with
+  tool calls and the token count read from that stretch of the tmux log.
+
+Usage:
+    python .claude/scripts/shared/telemetry.py ingest out/.cache/runs/plan-builder-20250101-120000
+    python .claude/scripts/shared/telemetry.py runs [--last 10]
+    python .claude/scripts/shared/telemetry.py report [--run RUN_ID] [--by kind|name|stage]
+    python .claude/scripts/shared/telemetry.py export [--run RUN_ID] > spans.jsonl
+
+``report`` without ``--run`` covers the most recent run. Its main table sums leaf
+spans only (startup, model, tool, mcp, session). ``run`` and ``step`` spans enclose
+those, so they are listed separately as wall time instead of being added twice.
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spans (
+    run_id             TEXT NOT NULL,
+    stage              TEXT NOT NULL,
+    kind               TEXT NOT NULL,
+    name               TEXT NOT NULL,
+    started_at         REAL,
+    duration_ms        REAL,
+    input_tokens       INTEGER NOT NULL DEFAULT 0,
+    output_tokens      INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens  INTEGER NOT NULL DEFAULT 0,
+    tool_calls         INTEGER NOT NULL DEFAULT 0,
+    api_ms             REAL,
+    ok                 INTEGER NOT NULL DEFAULT 1,
+    source             TEXT,
+    attrs              TEXT
+);
+CREATE INDEX IF NOT EXISTS spans_run ON spans(run_id);
+CREATE INDEX IF NOT EXISTS spans_source ON spans(source);
+"""
+
+# Spans that enclose other spans of the same stage: a whole agent run, a bench step.
+PARENT_KINDS = ("run", "step")
+
+COLUMNS = (
+    "run_id", "stage", "kind", "name", "started_at", "duration_ms", "input_tokens", "output_tokens",
+    "cache_read_tokens", "tool_calls", "api_ms", "ok", "source", "attrs",
+)
+
+# Tool call headers and the spinner's token counter in the Claude TUI.
+TUI_TOOL_CALL = re.compile(r"^\s*⏺ [^\n(]+\(", re.M)
+TUI_TOKENS = re.compile(r"([\d.]+)(k?) tokens")
+
+
+def stamp(line, now=None):
+    """Add a ``_ts`` receive time to one stream-json line (non-JSON lines pass through)."""
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError:
+        return line
+    if not isinstance(event, dict):
+        return line
+    event["_ts"] = time.time() if now is None else now
+    return json.dumps(event) + "\n"
+
+
+def start_marker(**attrs):
+    """First line of a stamped stream: when the CLI was spawned."""
+    return json.dumps({"type": "mixer", "subtype": "start", "_ts": time.time(), **attrs}) + "\n"
+
+
+def _span(stage, kind, name, start=None, end=None, duration_ms=None, attrs=None, **fields):
+    """Build a span; measured ``end - start`` wins over a reported ``duration_ms``."""
+    if start is not None and end is not None:
+        duration_ms = (end - start) * 1000
+    return {
+        "stage": stage, "kind": kind, "name": name, "started_at": start, "duration_ms": duration_ms,
+        "attrs": json.dumps(attrs) if attrs else None, **fields,
+    }
+
+
+def _usage(usage):
+    return {
+        "input_tokens": (usage.get("input_tokens") or 0) + (usage.get("cache_creation_input_tokens") or 0),
+        "output_tokens": usage.get("output_tokens") or 0,
+        "cache_read_tokens": usage.get("cache_read_input_tokens") or 0,
+    }
+
+
+def stream_spans(lines, stage, run_name=None):
+    """Turn stream-json events into span dicts (without run_id/source)."""
+    spawned = last = None
+    pending = {}
+    seen_messages = set()
+    tool_calls = 0
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(event, dict):
+            continue
+        kind, ts = event.get("type"), event.get("_ts")
+
+        if kind == "mixer" and event.get("subtype") == "start":
+            spawned = last = ts
+        elif kind == "system" and event.get("subtype") == "init":
+            if spawned is not None:
+                yield _span(stage, "startup", "claude startup", spawned, ts, attrs={"model": event.get("model")})
+            last = ts
+        elif kind == "assistant":
+            message = event.get("message", {})
+            if message.get("id") not in seen_messages:
+                seen_messages.add(message.get("id"))
+                yield _span(stage, "model", message.get("model") or "model", last, ts, **_usage(message.get("usage") or {}))
+            for block in message.get("content") or []:
+                if block.get("type") == "tool_use":
+                    tool_calls += 1
+                    pending[block.get("id")] = (block.get("name", "?"), ts)
+            last = ts
+        elif kind == "user":
+            content = event.get("message", {}).get("content")
+            for block in content if isinstance(content, list) else []:
+                if block.get("type") == "tool_result" and block.get("tool_use_id") in pending:
+                    name, began = pending.pop(block["tool_use_id"])
+                    tool_kind = "mcp" if name.startswith("mcp__") else "tool"
+                    yield _span(stage, tool_kind, name, began, ts, tool_calls=1, ok=int(not block.get("is_error")))
+            last = ts
+        elif kind == "result":
+            yield _span(
+                stage, "run", run_name or stage, spawned, ts,
+                duration_ms=event.get("duration_ms"),
+                api_ms=event.get("duration_api_ms"),
+                tool_calls=tool_calls,
+                ok=int(not event.get("is_error")),
+                attrs={"num_turns": event.get("num_turns"), "cost_usd": event.get("total_cost_usd")},
+                **_usage(event.get("usage") or {}),
+            )
+
+
+def tui_counts(text):
+    """Tool calls and the last reported token count in a stretch of tmux log text."""
+    tokens = 0
+    for number, kilo in TUI_TOKENS.findall(text):
+        try:
+            tokens = int(float(number) * (1000 if kilo else 1))
+        except ValueError:
+            pass
+    return len(TUI_TOOL_CALL.findall(text)), tokens
+
+
+def percentile(values, fraction):
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+class Telemetry:
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def record(self, run_id, spans, source=None):
+        rows = [
+            tuple({"run_id": run_id, "source": source, "input_tokens": 0, "output_tokens": 0,
+                   "cache_read_tokens": 0, "tool_calls": 0, "api_ms": None, "ok": 1, **span}.get(c) for c in COLUMNS)
+            for span in spans
+        ]
+        with self.db:
+            self.db.executemany(f"INSERT INTO spans VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+        return len(rows)
+
+    def ingest_stream(self, path, run_id, stage):
+        """(Re)load one stream-json file; returns the number of spans."""
+        path = Path(path)
+        with self.db:
+            self.db.execute("DELETE FROM spans WHERE source = ?", (str(path),))
+        with open(path, errors="replace") as fh:
+            return self.record(run_id, list(stream_spans(fh, stage, path.stem)), source=str(path))
+
+    def runs(self, last=10):
+        return self.db.execute("""
+            SELECT run_id, MIN(started_at) AS started_at, COUNT(*) AS spans,
+                   COUNT(DISTINCT stage) AS stages, SUM(kind = 'run') AS agent_runs
+            FROM spans GROUP BY run_id ORDER BY MAX(rowid) DESC LIMIT ?
+        """, (last,)).fetchall()
+
+    def latest_run(self):
+        row = self.db.execute("SELECT run_id FROM spans ORDER BY rowid DESC LIMIT 1").fetchone()
+        return row["run_id"] if row else None
+
+    def spans(self, run_id=None):
+        if run_id is None:
+            return self.db.execute("SELECT * FROM spans ORDER BY rowid").fetchall()
+        return self.db.execute("SELECT * FROM spans WHERE run_id = ? ORDER BY rowid", (run_id,)).fetchall()
+
+    def summary(self, run_id, by="kind", parents=False):
+        """Aggregate a run's spans by ``kind``, ``name`` or ``stage``.
+
+        Covers leaf spans only, or with ``parents`` only the ``PARENT_KINDS`` spans
+        that enclose them, so no duration or token is counted twice.
+        """
+        groups = {}
+        for span in self.spans(run_id):
+            if (span["kind"] in PARENT_KINDS) != parents:
+                continue
+            groups.setdefault(span[by], []).append(span)
+        rows = []
+        for key, spans in groups.items():
+            durations = [s["duration_ms"] for s in spans]
+            rows.append({
+                by: key,
+                "count": len(spans),
+                "total_s": sum(d for d in durations if d is not None) / 1000,
+                "p50_s": (percentile(durations, 0.5) or 0) / 1000,
+                "p95_s": (percentile(durations, 0.95) or 0) / 1000,
+                "api_s": sum(s["api_ms"] or 0 for s in spans) / 1000,
+                "input_tokens": sum(s["input_tokens"] for s in spans),
+                "output_tokens": sum(s["output_tokens"] for s in spans),
+                "cache_read_tokens": sum(s["cache_read_tokens"] for s in spans),
+                "tool_calls": sum(s["tool_calls"] for s in spans),
+                "failed": sum(not s["ok"] for s in spans),
+            })
+        return sorted(rows, key=lambda r: -r["total_s"])
+
+
+def open_telemetry(config):
+    return Telemetry(config.cache_dir() / "telemetry.db")
+
+
+def print_summary(title, rows, by):
+    print(title)
+    print(f"{by:<40} {'n':>5} {'total s':>9} {'p50 s':>7} {'p95 s':>7} {'api s':>7} "
+          f"{'in tok':>9} {'out tok':>8} {'cached':>9} {'tools':>6} {'fail':>5}")
+    for r in rows:
+        print(f"{str(r[by])[:40]:<40} {r['count']:>5} {r['total_s']:>9.1f} {r['p50_s']:>7.1f} {r['p95_s']:>7.1f} "
+              f"{r['api_s']:>7.1f} {r['input_tokens']:>9,} {r['output_tokens']:>8,} {r['cache_read_tokens']:>9,} "
+              f"{r['tool_calls']:>6} {r['failed']:>5}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="load stream-json files (or run directories)")
+    p_ingest.add_argument("paths", nargs="+", type=Path)
+    p_ingest.add_argument("--run", help="run id (default: the directory name)")
+    p_ingest.add_argument("--stage", help="stage name (default: the file name)")
+
+    sub.add_parser("runs", help="list recorded runs").add_argument("--last", type=int, default=10)
+
+    p_report = sub.add_parser("report", help="summarize one run")
+    p_report.add_argument("--run")
+    p_report.add_argument("--by", choices=["kind", "name", "stage"], default="kind")
+    p_report.add_argument("--json", action="store_true")
+
+    sub.add_parser("export", help="print spans as JSON lines").add_argument("--run")
+
+    args = parser.parse_args(argv)
+    telemetry = open_telemetry(load_config())
+
+    if args.command == "ingest":
+        for path in args.paths:
+            files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+            for file in files:
+                run_id = args.run or (path.name if path.is_dir() else file.parent.name)
+                count = telemetry.ingest_stream(file, run_id, args.stage or file.stem)
+                print(f"{file}: {count} spans -> {run_id}")
+    elif args.command == "runs":
+        for row in telemetry.runs(args.last):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["started_at"])) if row["started_at"] else "?"
+            print(f"{row['run_id']:<48} {when}  {row['spans']:>5} spans  {row['stages']:>3} stages")
+    elif args.command == "report":
+        run_id = args.run or telemetry.latest_run()
+        if run_id is None:
+            raise SystemExit("no spans recorded yet")
+        rows = telemetry.summary(run_id, args.by)
+        wall = telemetry.summary(run_id, args.by, parents=True)
+        if args.json:
+            print(json.dumps({"run_id": run_id, "by": args.by, "rows": rows, "wall": wall}, indent=2))
+        else:
+            print_summary(f"run {run_id}", rows, args.by)
+            if wall:
+                print()
+                print_summary(f"wall time ({', '.join(PARENT_KINDS)} spans, containing the above)", wall, args.by)
+    elif args.command == "export":
+        for span in telemetry.spans(args.run):
+            print(json.dumps(dict(span)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Stale-session handling in the orchestrator's warm pool (tmux calls are stubbed)."""
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "orchestrator"))
+
+import agent_pool  # noqa: E402
+from agent_session import Readiness  # noqa: E402
+
+
+class PoolHealthTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.pool = agent_pool.Pool(Path(tmp.name) / "pool.db", Path(tmp.name), Readiness({"timeout_seconds": 10}), {})
+        self.started = []
+        start = mock.patch.object(
+            agent_pool.Pool, "start", lambda pool, agent, name, resume=None: self.started.append((name, resume))
+        )
+        for patcher in (start, mock.patch.object(agent_pool, "tmux"),
+                        mock.patch.object(agent_pool, "session_exists", lambda name: False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def add(self, name, state, claude_id="", age=0):
+        with self.pool._db() as db:
+            db.execute(
+                "INSERT INTO pool VALUES (?, 'goal-builder', ?, ?, 0, ?, ?)",
+                (name, claude_id, state, time.time() - age, time.time() - age),
+            )
+
+    def test_claim_is_exclusive(self):
+        self.add("goal-builder-pool-1", "idle")
+        row = self.pool.rows()[0]
+        self.assertTrue(self.pool.claim(row))
+        self.assertFalse(self.pool.claim(row))
+        self.assertEqual(self.pool.rows()[0]["state"], "starting")
+
+    def test_dead_busy_session_is_resumed(self):
+        self.add("goal-builder-pool-1", "busy", claude_id="abc")
+        self.add("goal-builder-pool-2", "idle", claude_id="def")
+        restarted = self.pool.health()
+        self.assertEqual([name for name, _ in restarted], ["goal-builder-pool-1", "goal-builder-pool-2"])
+        self.assertEqual(self.started, [("goal-builder-pool-1", "abc"), ("goal-builder-pool-2", None)])
+
+    def test_only_stuck_starting_rows_are_restarted(self):
+        self.add("goal-builder-pool-1", "starting", age=5)
+        self.add("goal-builder-pool-2", "starting", age=60)
+        self.assertEqual(self.pool.health(), [("goal-builder-pool-2", "start never finished")])
+        self.assertEqual(self.started, [("goal-builder-pool-2", None)])
+
+    def test_second_health_check_skips_a_claimed_row(self):
+        self.add("goal-builder-pool-1", "idle")
+        stale = self.pool.rows()
+        self.pool.health()
+        # A second process that listed the rows before the first one claimed them.
+        with mock.patch.object(self.pool, "rows", lambda agent=None: stale):
+            self.assertEqual(self.pool.health(), [])
+        self.assertEqual(len(self.started), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
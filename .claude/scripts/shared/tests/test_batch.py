@@ -0,0 +1,59 @@
+"""Ticket leases and worker failures in headless batch runs."""
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.batch import Leases, run_all  # noqa: E402
+
+
+class LeasesTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "mirror.db"
+
+    def leases(self, owner, seconds=0.3):
+        return Leases(self.path, owner, seconds)
+
+    def test_lease_is_exclusive_until_released(self):
+        a, b = self.leases("a"), self.leases("b")
+        self.assertTrue(a.acquire("SYS-1"))
+        self.assertFalse(b.acquire("SYS-1"))
+        b.release("SYS-1")  # not b's lease
+        self.assertFalse(b.acquire("SYS-1"))
+        a.release("SYS-1")
+        self.assertTrue(b.acquire("SYS-1"))
+
+    def test_expired_lease_can_be_taken_over(self):
+        a, b = self.leases("a", seconds=0.1), self.leases("b")
+        self.assertTrue(a.acquire("SYS-1"))
+        time.sleep(0.15)
+        self.assertTrue(b.acquire("SYS-1"))
+
+    def test_held_lease_outlives_its_lifetime_without_output(self):
+        a, b = self.leases("a"), self.leases("b")
+        self.assertTrue(a.acquire("SYS-1"))
+        with a.held("SYS-1"):
+            time.sleep(1)
+            self.assertFalse(b.acquire("SYS-1"))
+        self.assertTrue(b.acquire("SYS-1"))
+
+
+class RunAllTest(unittest.TestCase):
+    def test_worker_exception_fails_only_its_ticket(self):
+        def run(identifier):
+            if identifier == "SYS-2":
+                raise OSError("claude not found")
+            return identifier, "done"
+
+        results = run_all(["SYS-1", "SYS-2", "SYS-3"], 2, run)
+        self.assertEqual(results, {"SYS-1": "done", "SYS-2": "failed", "SYS-3": "done"})
+
+
+if __name__ == "__main__":
+    unittest.main()
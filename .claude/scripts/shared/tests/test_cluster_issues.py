@@ -0,0 +1,48 @@
+"""Grouping and duplicate detection in the issue pre-clustering."""
+
+import sys
+import unittest
+from pathlib import Path
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    raise unittest.SkipTest("cluster_issues.py needs numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "goal-builder"))
+
+import cluster_issues  # noqa: E402
+
+SETTINGS = {**cluster_issues.DEFAULTS, "threshold": 0.3}
+
+
+def issue(number, title, labels=()):
+    return {"number": number, "title": title, "body": "", "labels": list(labels), "updated_at": "2024-01-01"}
+
+
+def analyze(issues):
+    return cluster_issues.analyze(issues, [cluster_issues.issue_terms(i) for i in issues], SETTINGS)
+
+
+class AnalyzeTest(unittest.TestCase):
+    def test_related_issues_are_not_duplicates(self):
+        report = analyze([
+            issue(1, "Login fails with OAuth token"),
+            issue(2, "OAuth login redirect broken"),
+            issue(3, "Dashboard chart colors wrong"),
+            issue(4, "Dashboard chart legend missing"),
+        ])
+        self.assertEqual(report["duplicates"], [])
+        self.assertIn([1, 2], [[i["number"] for i in g["issues"]] for g in report["groups"]])
+
+    def test_same_issue_filed_twice_is_a_duplicate(self):
+        report = analyze([
+            issue(1, "OAuth login redirect broken", ["auth"]),
+            issue(2, "OAuth login redirect broken", ["auth"]),
+            issue(3, "Dashboard chart colors wrong"),
+        ])
+        self.assertEqual([(d["a"], d["b"]) for d in report["duplicates"]], [(1, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Delta storage, history and packing in the draft store."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.draft_store import DraftStore, StoreError, apply_delta, make_delta  # noqa: E402
+
+
+def draft(n):
+    """A goal draft whose n-th revision changes, adds and drops a few lines."""
+    lines = [f"# Goal v{n}\n", "\n", "## Requirements\n"]
+    lines += [f"- requirement {i}{' (revised)' if i == n % 7 else ''}\n" for i in range(20 + n % 3)]
+    return "".join(lines)
+
+
+class DeltaTest(unittest.TestCase):
+    def test_round_trip(self):
+        cases = [("", "a\n"), ("a\nb\nc\n", "a\nc\nd\n"), ("x\n" * 5, ""), (draft(1), draft(2)), (draft(5), draft(1))]
+        for old, new in cases:
+            old_lines, new_lines = old.splitlines(keepends=True), new.splitlines(keepends=True)
+            self.assertEqual(apply_delta(old_lines, make_delta(old_lines, new_lines)), new_lines)
+
+
+class DraftStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "drafts.db"
+        self.store = self.open()
+
+    def open(self, **kwargs):
+        store = DraftStore(self.path, **kwargs)
+        self.addCleanup(store.db.close)
+        return store
+
+    def test_versions_read_back_through_delta_chains(self):
+        store = self.open(max_chain=3)
+        for n in range(1, 11):
+            self.assertEqual(store.put("goal-draft", draft(n)), (n, True))
+        self.assertEqual(store.put("goal-draft", draft(10)), (10, False))
+        for n in range(1, 11):
+            self.assertEqual(store.get("goal-draft", n), draft(n))
+        self.assertIn("+# Goal v4", store.diff("goal-draft", 3, 4))
+
+    def test_pack_keeps_every_version_readable(self):
+        for n in range(1, 31):
+            self.store.put("goal-draft", draft(n))
+        self.store.archive("goal-draft", "SYS-10")
+        self.store.put("goal-draft", "abandoned\n")
+        self.store.start("goal-draft")
+
+        packed = self.open(max_chain=4)
+        stats = packed.pack()
+        self.assertGreater(stats["rebased"], 0)
+        self.assertEqual(stats["removed"], 1)
+        self.assertEqual(packed.db.execute("SELECT MAX(depth) FROM objects").fetchone()[0], 4)
+        for n in range(1, 31):
+            self.assertEqual(packed.get("SYS-10", n), draft(n))
+
+    def test_start_drops_an_abandoned_draft(self):
+        self.store.put("goal-draft", "goal A v1\n")
+        self.store.put("goal-draft", "goal A v2\n")
+        self.assertEqual(self.store.start("goal-draft"), 2)
+        self.assertEqual(self.store.put("goal-draft", "goal B v1\n"), (1, True))
+
+        self.store.archive("goal-draft", "SYS-20")
+        self.assertEqual([r["version"] for r in self.store.history("SYS-20")], [1])
+        self.assertEqual(self.store.get("SYS-20"), "goal B v1\n")
+
+    def test_start_refuses_archived_identifiers(self):
+        self.store.put("goal-draft", "text\n")
+        self.store.archive("goal-draft", "SYS-10")
+        with self.assertRaises(StoreError):
+            self.store.start("SYS-10")
+        self.assertEqual(len(self.store.history("SYS-10")), 1)
+        self.assertEqual(self.store.start("plan-draft-SYS-10"), 0)
+
+    def test_archive_appends_sessions_and_packs_periodically(self):
+        store = self.open(pack_every=2)
+        store.put("goal-draft", "first\n")
+        store.put("goal-draft", "second\n")
+        self.assertIsNone(store.archive("goal-draft", "SYS-10")[2])
+        store.start("goal-draft")
+        store.put("goal-draft", "third\n")
+        count, _, stats = store.archive("goal-draft", "SYS-10")
+
+        self.assertEqual(count, 1)
+        self.assertIsNotNone(stats)
+        self.assertEqual([r["version"] for r in store.history("SYS-10")], [1, 2, 3])
+        self.assertEqual(store.get("SYS-10", 3), "third\n")
+        self.assertEqual(store.history("goal-draft"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""Incremental sync against a local stand-in for the GitHub and Linear APIs.
+
+Run with:
+    python -m pytest -q .claude/scripts/shared/tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.config import Config  # noqa: E402
+from shared.github_client import GitHubClient  # noqa: E402
+from shared.linear_client import LinearClient  # noqa: E402
+from shared.mirror import Mirror, create_ids, sync_github, sync_linear  # noqa: E402
+
+CONFIG = {
+    "github": {"repo": "o/r", "auth": {"token_env": "MIXER_TEST_GITHUB_TOKEN"}},
+    "linear": {
+        "team_id": "SYS",
+        "tickets": {"goal_label": "goal", "statuses": {"draft": "Draft"}},
+        "auth": {"api_key_env": "MIXER_TEST_LINEAR_KEY"},
+    },
+}
+
+
+def github_issue(number, updated_at):
+    return {"number": number, "title": f"#{number}", "state": "open", "labels": [], "body": "", "updated_at": updated_at}
+
+
+def linear_issue(identifier, updated_at):
+    return {
+        "id": f"id-{identifier}", "identifier": identifier, "title": identifier, "description": "",
+        "updatedAt": updated_at, "state": {"name": "Draft"}, "labels": {"nodes": [{"name": "goal"}]}, "parent": None,
+    }
+
+
+class FakeApi:
+    """Serves GitHub issue listings and Linear GraphQL from in-memory data, recording every request."""
+
+    def __init__(self):
+        self.github_issues = []
+        self.github_etag = '"v1"'
+        self.linear_issues = []
+        self.labels = {"goal": "L-goal"}
+        self.requests = []
+        self.queries = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, payload=None, headers=None):
+                body = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                api.requests.append(("github", query, self.headers.get("If-None-Match")))
+                if self.headers.get("If-None-Match") == api.github_etag:
+                    return self.reply(304, headers={"ETag": api.github_etag})
+                since = query.get("since", "")
+                issues = [i for i in api.github_issues if i["updated_at"] >= since]
+                self.reply(200, issues, {"ETag": api.github_etag})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                variables = payload["variables"]
+                api.requests.append(("linear", variables, None))
+                api.queries.append(payload["query"])
+                if "teams" in payload["query"]:
+                    team = {
+                        "id": "T-sys", "key": "SYS",
+                        "labels": {"nodes": [{"id": i, "name": n} for n, i in api.labels.items()]},
+                        "states": {"nodes": [{"id": "S-draft", "name": "Draft"}]},
+                    }
+                    return self.reply(200, {"data": {"teams": {"nodes": [team]}}})
+                after = (variables["filter"].get("updatedAt") or {}).get("gt", "")
+                issues = [i for i in api.linear_issues if i["updatedAt"] > after]
+                page = {"nodes": issues, "pageInfo": {"hasNextPage": False, "endCursor": None}}
+                self.reply(200, {"data": {"issues": page}})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def requests_to(self, api):
+        return [(params, etag) for source, params, etag in self.requests if source == api]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class IncrementalSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi()
+        self.addCleanup(self.api.close)
+        env = {
+            "GITHUB_API_URL": self.api.url,
+            "LINEAR_API_URL": self.api.url,
+            "MIXER_TEST_GITHUB_TOKEN": "token",
+            "MIXER_TEST_LINEAR_KEY": "key",
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = Config(CONFIG, Path(tmp.name) / "config.yaml")
+        self.mirror = Mirror(Path(tmp.name) / "mirror.db")
+        self.addCleanup(self.mirror.db.close)
+
+    def test_github_sends_since_cursor_after_first_sync(self):
+        self.api.github_issues = [github_issue(1, "2024-01-01T00:00:00Z"), github_issue(2, "2024-01-02T00:00:00Z")]
+        self.assertEqual(sync_github(self.mirror, GitHubClient(self.config)), 2)
+
+        self.api.github_etag = '"v2"'
+        self.api.github_issues.append(github_issue(3, "2024-01-03T00:00:00Z"))
+        self.assertEqual(sync_github(self.mirror, GitHubClient(self.config)), 2)  # #2 again (since is inclusive) and #3
+
+        first, second = self.api.requests_to("github")
+        self.assertNotIn("since", first[0])
+        self.assertEqual(second[0]["since"], "2024-01-02T00:00:00Z")
+        self.assertEqual(self.mirror.sync_state("github")["cursor"], "2024-01-03T00:00:00Z")
+        self.assertEqual([i["number"] for i in self.mirror.github_issues()], [1, 2, 3])
+
+    def test_github_unchanged_listing_is_a_304(self):
+        self.api.github_issues = [github_issue(1, "2024-01-01T00:00:00Z")]
+        sync_github(self.mirror, GitHubClient(self.config))
+        self.assertEqual(sync_github(self.mirror, GitHubClient(self.config)), 0)
+
+        _, second = self.api.requests_to("github")
+        self.assertEqual(second[1], '"v1"')
+        state = self.mirror.sync_state("github")
+        self.assertEqual((state["cursor"], state["etag"]), ("2024-01-01T00:00:00Z", '"v1"'))
+
+    def test_github_full_sync_drops_cursor_and_etag(self):
+        self.api.github_issues = [github_issue(1, "2024-01-01T00:00:00Z")]
+        sync_github(self.mirror, GitHubClient(self.config))
+        self.assertEqual(sync_github(self.mirror, GitHubClient(self.config), full=True), 1)
+
+        _, second = self.api.requests_to("github")
+        self.assertEqual(second, ({"state": "all", "per_page": "100", "sort": "updated", "direction": "asc"}, None))
+
+    def test_linear_sends_updated_at_cursor_after_first_sync(self):
+        self.api.linear_issues = [linear_issue("SYS-1", "2024-01-01T00:00:00Z")]
+        self.assertEqual(sync_linear(self.mirror, LinearClient(self.config)), 1)
+
+        self.api.linear_issues.append(linear_issue("SYS-2", "2024-01-02T00:00:00Z"))
+        self.assertEqual(sync_linear(self.mirror, LinearClient(self.config)), 1)
+        self.assertEqual(sync_linear(self.mirror, LinearClient(self.config)), 0)
+
+        listings = [params["filter"] for params, _ in self.api.requests_to("linear") if "filter" in params]
+        self.assertNotIn("updatedAt", listings[0])
+        self.assertEqual(listings[1]["updatedAt"], {"gt": "2024-01-01T00:00:00Z"})
+        self.assertEqual(listings[2]["updatedAt"], {"gt": "2024-01-02T00:00:00Z"})
+        self.assertEqual({t["identifier"] for t in self.mirror.linear_issues()}, {"SYS-1", "SYS-2"})
+
+    def test_linear_drops_archived_and_trashed_issues(self):
+        self.api.linear_issues = [linear_issue(f"SYS-{n}", "2024-01-01T00:00:00Z") for n in (1, 2, 3)]
+        sync_linear(self.mirror, LinearClient(self.config))
+
+        self.api.linear_issues[0].update(updatedAt="2024-01-02T00:00:00Z", archivedAt="2024-01-02T00:00:00Z")
+        self.api.linear_issues[1].update(updatedAt="2024-01-02T00:00:00Z", trashed=True)
+        self.assertEqual(sync_linear(self.mirror, LinearClient(self.config)), 2)
+
+        self.assertEqual([t["identifier"] for t in self.mirror.linear_issues(state="Draft")], ["SYS-3"])
+        self.assertIsNone(self.mirror.linear_issue("SYS-1"))
+        self.assertIn("includeArchived: true", self.api.queries[-1])
+
+    def test_linear_lookups_load_once(self):
+        for _ in range(3):
+            sync_linear(self.mirror, LinearClient(self.config))
+        team_queries = [params for params, _ in self.api.requests_to("linear") if "key" in params]
+        self.assertEqual(len(team_queries), 1)
+
+    def test_create_ids_reloads_lookups_on_a_miss(self):
+        sync_linear(self.mirror, LinearClient(self.config))
+        self.api.labels["plan"] = "L-plan"
+
+        ids = create_ids(self.config, self.mirror, label="plan", status="draft")
+        self.assertEqual(ids, {"teamId": "T-sys", "labelIds": ["L-plan"], "stateId": "S-draft"})
+
+        with self.assertRaises(SystemExit) as raised:
+            create_ids(self.config, self.mirror, label="epic")
+        self.assertIn("labelIds", str(raised.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
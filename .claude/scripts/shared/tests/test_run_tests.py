@@ -0,0 +1,77 @@
+"""Which test files the module test runner considers affected by a change."""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "module-builder"))
+
+import run_tests  # noqa: E402
+
+FILES = {
+    "modules/__init__.py": "",
+    "modules/common/__init__.py": "",
+    "modules/common/util.py": "def double(x):\n    return 2 * x\n",
+    "modules/auth/__init__.py": "",
+    "modules/auth/core.py": "from modules.common.util import double\n",
+    "modules/auth/tests/__init__.py": "",
+    "modules/auth/tests/test_core.py": "from modules.auth.core import double\n",
+    "modules/auth/tests/test_other.py": "import json\n",
+}
+
+
+class AffectedTestsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name).resolve()
+        for name, text in FILES.items():
+            self.write(name, text)
+        self.cache = run_tests.TestCache(self.root / "tests.db")
+        self.addCleanup(self.cache.db.close)
+
+    def write(self, name, text):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    def affected(self):
+        """Plan a run of ``auth``, record every planned file as passed, return their names."""
+        graph = run_tests.ModuleGraph(self.root, self.root / "modules" / "auth")
+        to_run, _ = run_tests.plan(graph, self.cache, "auth")
+        for test, fingerprint, _ in to_run:
+            self.cache.record("auth", str(test.relative_to(self.root)), fingerprint, "passed", 0)
+        return sorted(test.name for test, _, _ in to_run)
+
+    def test_unchanged_files_are_skipped(self):
+        self.assertEqual(self.affected(), ["test_core.py", "test_other.py"])
+        self.assertEqual(self.affected(), [])
+
+    def test_change_in_sibling_module_invalidates_importers(self):
+        self.affected()
+        self.write("modules/common/util.py", "def double(x):\n    return x + x + 1\n")
+        self.assertEqual(self.affected(), ["test_core.py"])
+
+    def test_change_in_own_module_invalidates_importers(self):
+        self.affected()
+        self.write("modules/auth/core.py", "from modules.common.util import double as twice\n")
+        self.assertEqual(self.affected(), ["test_core.py"])
+
+    def test_shared_conftest_and_pytest_config_invalidate_everything(self):
+        self.affected()
+        self.write("modules/conftest.py", "import pytest\n")
+        self.assertEqual(self.affected(), ["test_core.py", "test_other.py"])
+        self.write("pytest.ini", "[pytest]\n")
+        self.assertEqual(self.affected(), ["test_core.py", "test_other.py"])
+
+    def test_failed_file_runs_again(self):
+        graph = run_tests.ModuleGraph(self.root, self.root / "modules" / "auth")
+        to_run, _ = run_tests.plan(graph, self.cache, "auth")
+        for test, fingerprint, _ in to_run:
+            self.cache.record("auth", str(test.relative_to(self.root)), fingerprint, "failed", 0)
+        self.assertEqual(self.affected(), ["test_core.py", "test_other.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""Batched writes against a local stand-in for the GitHub and Linear APIs."""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from shared.config import Config  # noqa: E402
+from shared.mirror import Mirror  # noqa: E402
+from shared.writes import WriteClient  # noqa: E402
+
+CONFIG = {
+    "github": {"repo": "o/r", "auth": {"token_env": "MIXER_TEST_GITHUB_TOKEN"}},
+    "linear": {
+        "team_id": "SYS",
+        "tickets": {"goal_label": "goal", "statuses": {"draft": "Draft"}},
+        "auth": {"api_key_env": "MIXER_TEST_LINEAR_KEY"},
+    },
+    "writes": {"max_attempts": 1},
+}
+
+LOOKUPS = {"team": {"SYS": "T-sys"}, "label": {"goal": "L-goal"}, "state": {"Draft": "S-draft"}}
+
+
+class FakeApi:
+    """Accepts issue creates/updates (Linear) and comments/closes (GitHub), logging each write."""
+
+    def __init__(self):
+        self.writes = []
+        self.issues = {}
+        self.fail_creates = False
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def body(self):
+                return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+            def do_PATCH(self):
+                number = int(self.path.rsplit("/", 1)[1])
+                api.writes.append(("close", number, self.body()["state"]))
+                self.reply({"number": number, "state": "closed"})
+
+            def do_POST(self):
+                payload = self.body()
+                if self.path.endswith("/comments"):
+                    number = int(self.path.split("/")[-2])
+                    api.writes.append(("comment", number, payload["body"]))
+                    return self.reply({"id": len(api.writes)}, 201)
+                if "issue(id:" in payload["query"]:
+                    return self.reply({"data": {"issue": api.issues.get(payload["variables"]["id"])}})
+                data, errors = {}, []
+                for alias in re.findall(r"(\w+): issueCreate", payload["query"]):
+                    issue_input = payload["variables"][f"{alias}_input"]
+                    api.writes.append(("create", issue_input["id"], issue_input["title"]))
+                    if api.fail_creates:
+                        errors.append({"message": "create rejected", "path": [alias]})
+                        continue
+                    issue = {"id": issue_input["id"], "identifier": f"SYS-{len(api.issues) + 100}",
+                             "url": "", "state": {"name": "Draft"}}
+                    api.issues[issue["id"]] = issue
+                    data[alias] = {"success": True, "issue": issue}
+                self.reply({"data": data, **({"errors": errors} if errors else {})})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+GOAL_AND_CLOSES = [
+    {"op": "github.close", "number": 11, "key": "close:11:goal:auth", "after": "goal:auth",
+     "comment": "Closed: Created Linear goal {identifier} from this issue."},
+    {"op": "linear.create", "key": "goal:auth", "input": {"title": "Auth", "label": "goal", "status": "draft"}},
+    {"op": "github.close", "number": 12, "key": "close:12:goal:auth", "after": "goal:auth"},
+]
+
+
+class WriteClientTest(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi()
+        self.addCleanup(self.api.close)
+        env = {
+            "GITHUB_API_URL": self.api.url,
+            "LINEAR_API_URL": self.api.url + "/graphql",
+            "MIXER_TEST_GITHUB_TOKEN": "token",
+            "MIXER_TEST_LINEAR_KEY": "key",
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = Config(CONFIG, Path(tmp.name) / "config.yaml")
+        self.mirror = Mirror(Path(tmp.name) / "mirror.db")
+        self.addCleanup(self.mirror.db.close)
+        self.mirror.set_lookups(LOOKUPS)
+
+    def apply(self, ops):
+        return asyncio.run(WriteClient(self.config, self.mirror).apply(ops))
+
+    def test_closes_wait_for_the_create_and_get_its_identifier(self):
+        results = self.apply(GOAL_AND_CLOSES)
+        self.assertEqual([r["status"] for r in results], ["ok", "ok", "ok"])
+        self.assertEqual(self.api.writes[0][0], "create")
+        self.assertIn(("comment", 11, "Closed: Created Linear goal SYS-100 from this issue."), self.api.writes)
+        self.assertEqual(sorted(w[1] for w in self.api.writes if w[0] == "close"), [11, 12])
+
+    def test_rerun_reports_cached_without_writing(self):
+        self.apply(GOAL_AND_CLOSES)
+        count = len(self.api.writes)
+        results = self.apply(GOAL_AND_CLOSES)
+        self.assertEqual([r["status"] for r in results], ["cached", "cached", "cached"])
+        self.assertEqual(len(self.api.writes), count)
+
+    def test_failed_create_skips_dependent_closes(self):
+        self.api.fail_creates = True
+        results = self.apply(GOAL_AND_CLOSES)
+        self.assertEqual([r["status"] for r in results], ["error", "error", "error"])
+        self.assertEqual(results[0]["error"], "not run: goal:auth failed")
+        self.assertEqual([w[0] for w in self.api.writes], ["create"])
+
+    def test_create_id_is_a_stable_v4_uuid(self):
+        self.apply(GOAL_AND_CLOSES[1:2])
+        self.mirror.db.execute("DELETE FROM write_ledger")
+        self.apply(GOAL_AND_CLOSES[1:2])
+        first, second = (w[1] for w in self.api.writes if w[0] == "create")
+        self.assertEqual(first, second)
+        self.assertEqual(uuid.UUID(first).version, 4)
+        self.assertEqual(len(self.api.issues), 1)
+
+    def test_ledger_entries_expire(self):
+        close = [{"op": "github.close", "number": 12, "key": "close:12"}]
+        self.apply(close)
+        with self.mirror.db:
+            self.mirror.db.execute("UPDATE write_ledger SET created_at = ?", (time.time() - 8 * 24 * 3600,))
+        results = self.apply(close)
+        self.assertEqual(results[0]["status"], "ok")
+        self.assertEqual([w for w in self.api.writes if w[0] == "close"], [("close", 12, "closed")] * 2)
+
+    def test_unknown_dependency_and_cycle(self):
+        results = self.apply([
+            {"op": "github.close", "number": 1, "key": "a", "after": "b"},
+            {"op": "github.close", "number": 2, "key": "b", "after": "a"},
+            {"op": "github.close", "number": 3, "after": "missing"},
+        ])
+        self.assertEqual(results[2]["error"], "unknown dependency missing")
+        self.assertTrue(results[0]["error"].startswith("dependency cycle"))
+        self.assertEqual(self.api.writes, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Minimal keep-alive JSON-over-HTTP transport built on http.client.
+
+Base URLs can point at a local stand-in server (``http://127.0.0.1:8765``),
+which is how the mirror and clients are exercised offline.
+"""
+
+import http.client
+import json
+import threading
+from urllib.parse import urlencode, urlsplit
+
+
+class HttpError(Exception):
+    """Non-2xx response (other than 304) from an API."""
+
+    def __init__(self, status, message, response=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.response = response
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def header(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+class JsonHttp:
+    """One persistent connection per thread to a single API host.
+
+    Driving it from a thread pool therefore gives a pool of keep-alive
+    connections. ``observer``, if set, is called with every response
+    (e.g. to feed rate-limit headers to a limiter).
+    """
+
+    def __init__(self, base_url, headers=None, timeout=30, observer=None):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.headers = {"Accept": "application/json", "Connection": "keep-alive", **(headers or {})}
+        self.timeout = timeout
+        self.observer = observer
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def request(self, method, path, params=None, body=None, headers=None):
+        if path.startswith(("http://", "https://")):
+            # Absolute URLs (e.g. pagination links) already carry the prefix and query.
+            parts = urlsplit(path)
+            url = parts.path + (f"?{parts.query}" if parts.query else "")
+        else:
+            url = self.prefix + path
+        if params:
+            url += "?" + urlencode(params)
+        payload = json.dumps(body).encode() if body is not None else None
+        merged = dict(self.headers)
+        if payload is not None:
+            merged["Content-Type"] = "application/json"
+        merged.update(headers or {})
+
+        # A keep-alive connection may have been dropped by the server while idle;
+        # retry exactly once on a fresh connection in that case.
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request(method, url, body=payload, headers=merged)
+                raw = conn.getresponse()
+                data = raw.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close()
+                if attempt == 2:
+                    raise
+            except (OSError, http.client.HTTPException):
+                # Don't leave a half-used connection behind for the next request.
+                self.close()
+                raise
+
+        response = Response(raw.status, {k.lower(): v for k, v in raw.getheaders()}, data)
+        if self.observer is not None:
+            self.observer(response)
+        if raw.status >= 400:
+            raise HttpError(raw.status, data[:200].decode(errors="replace"), response)
+        return response
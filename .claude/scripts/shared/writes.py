@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""Pooled, batched, rate-limit-aware GitHub/Linear writes.
+
+Agent backends hand this a list of write operations instead of issuing
+``create_issue`` / ``update_issue`` / ``close_issue`` one at a time:
+
+- Linear creates and updates are combined into aliased GraphQL mutations
+  (``linear.batch_size`` per request).
+- GitHub calls for different issues run concurrently with asyncio, over a pool
+  of keep-alive connections, under a token bucket that also honors
+  ``X-RateLimit-*`` and ``Retry-After`` headers.
+- Transient failures (connection errors, 429, 5xx) are retried with backoff.
+- An operation with a ``key`` is idempotent across runs: completed keys are
+  recorded in a ledger, and Linear creates use a client-supplied issue ``id``
+  derived from the key, so a retried or re-run create can never make a
+  duplicate goal. Operations without a key are never skipped as done. Ledger
+  entries expire after ``ledger_ttl_seconds`` (a re-run is a retry, not a
+  new write weeks later); keys should still name the whole intent, e.g.
+  ``close:11:goal:auth-module`` rather than ``close:11``.
+- ``after`` names the ``key`` of another operation. The op runs only once that
+  one has succeeded, with ``{identifier}`` in its strings replaced by the new
+  issue's identifier; if it failed, the op is not run.
+
+Operations (JSON list on stdin or in a file):
+
+    {"op": "linear.create", "key": "goal:auth-module",
+     "input": {"title": "...", "description": "...", "label": "goal", "status": "draft",
+               "parent": "SYS-10"}}
+    {"op": "linear.update", "id": "SYS-10", "input": {"status": "doing"}}
+    {"op": "github.close", "number": 11, "after": "goal:auth-module",
+     "comment": "Closed: Created Linear goal {identifier} from this issue."}
+    {"op": "github.comment", "number": 11, "body": "..."}
+
+``label``/``status``/``parent`` are resolved to IDs from the mirror's cached
+lookups (reloaded from Linear on a miss; unmirrored parents are fetched live);
+raw ``labelIds``/``stateId``/``parentId`` pass through unchanged.
+
+Usage:
+    python .claude/scripts/shared/writes.py apply ops.json
+    echo '[...]' | python .claude/scripts/shared/writes.py apply -
+
+Prints one JSON result per operation, in order, and exits non-zero if any failed.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.config import load_config  # noqa: E402
+from shared.github_client import GitHubClient  # noqa: E402
+from shared.linear_client import LinearClient, LinearError  # noqa: E402
+from shared.mirror import open_mirror, reload_lookups, sync  # noqa: E402
+from shared.ratelimit import TokenBucket  # noqa: E402
+from shared.transport import HttpError  # noqa: E402
+
+DEFAULTS = {
+    "concurrency": 4,
+    "github_per_minute": 80,
+    "github_burst": 10,
+    "linear_per_minute": 60,
+    "linear_burst": 5,
+    "linear_batch_size": 20,
+    "max_attempts": 4,
+    "ledger_ttl_seconds": 7 * 24 * 3600,
+}
+
+# Fixed namespace so the same idempotency key always maps to the same Linear issue id.
+IDEMPOTENCY_NAMESPACE = uuid.UUID("6f1c9a52-3c1e-4f7e-9d0b-1c2a7d4e8b90")
+
+LEDGER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS write_ledger (
+    key         TEXT PRIMARY KEY,
+    result      TEXT NOT NULL,
+    created_at  REAL NOT NULL
+);
+"""
+
+
+class WriteError(Exception):
+    """An operation failed permanently (bad input or non-retryable API error)."""
+
+
+def is_transient(exc):
+    status = getattr(exc, "status", None)
+    if status is None:
+        return isinstance(exc, (OSError, TimeoutError)) and not isinstance(exc, HttpError)
+    return status == 429 or status >= 500 or status == 403 and exc.response is not None and (
+        exc.response.header("retry-after") or exc.response.header("x-ratelimit-remaining") == "0"
+    )
+
+
+def key_uuid(key):
+    """Stable UUID for an idempotency key, with v4 version/variant bits as Linear expects."""
+    digest = hashlib.sha256(IDEMPOTENCY_NAMESPACE.bytes + key.encode()).digest()
+    return str(uuid.UUID(bytes=digest[:16], version=4))
+
+
+def fill(value, identifier):
+    """Replace ``{identifier}`` in every string of an op with its dependency's identifier."""
+    if isinstance(value, str):
+        return value.replace("{identifier}", identifier)
+    if isinstance(value, dict):
+        return {k: fill(v, identifier) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fill(v, identifier) for v in value]
+    return value
+
+
+class WriteClient:
+    def __init__(self, config, mirror):
+        self.config = config
+        self.mirror = mirror
+        self.settings = {**DEFAULTS, **config.get("writes", {})}
+        self.github_bucket = TokenBucket(self.settings["github_per_minute"], self.settings["github_burst"])
+        self.linear_bucket = TokenBucket(self.settings["linear_per_minute"], self.settings["linear_burst"])
+        self.executor = ThreadPoolExecutor(max_workers=self.settings["concurrency"])
+        self._github = self._linear = None
+        self.lookups_reloaded = False
+        mirror.db.executescript(LEDGER_SCHEMA)
+
+    @property
+    def github(self):
+        if self._github is None:
+            self._github = GitHubClient(self.config)
+            self._github.http.observer = self.github_bucket.observe
+        return self._github
+
+    @property
+    def linear(self):
+        if self._linear is None:
+            self._linear = LinearClient(self.config)
+            self._linear.http.observer = self.linear_bucket.observe
+        return self._linear
+
+    # -- ledger ------------------------------------------------------------
+
+    def done(self, key):
+        if key is None:
+            return None
+        row = self.mirror.db.execute(
+            "SELECT result FROM write_ledger WHERE key = ? AND created_at > ?",
+            (key, time.time() - self.settings["ledger_ttl_seconds"]),
+        ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def record(self, key, result):
+        if key is None:
+            return
+        with self.mirror.db:
+            self.mirror.db.execute(
+                "INSERT OR REPLACE INTO write_ledger VALUES (?, ?, ?)", (key, json.dumps(result), time.time())
+            )
+
+    # -- plumbing ----------------------------------------------------------
+
+    async def call(self, bucket, fn, *args):
+        """Run a blocking client call on the connection pool with rate limiting and retries."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.settings["max_attempts"] + 1):
+            await bucket.acquire()
+            try:
+                return await loop.run_in_executor(self.executor, fn, *args)
+            except (HttpError, LinearError, OSError) as exc:
+                if attempt == self.settings["max_attempts"] or not is_transient(exc):
+                    raise
+                await asyncio.sleep(min(2 ** attempt, 30) * (0.5 + random.random() / 2))
+
+    def resolve_input(self, issue_input, create):
+        """Map label/status/parent names to IDs, reloading lookups once per client on a miss."""
+        def resolve():
+            resolved = {k: v for k, v in issue_input.items() if k not in ("label", "status", "parent")}
+            if create:
+                resolved.setdefault("teamId", self.mirror.lookup("team", self.config.linear_team))
+            if "label" in issue_input:
+                resolved["labelIds"] = [self.mirror.lookup("label", self.config.label_name(issue_input["label"]))]
+            if "status" in issue_input:
+                resolved["stateId"] = self.mirror.lookup("state", self.config.status_name(issue_input["status"]))
+            return resolved, [k for k, v in resolved.items() if v is None or v == [None]]
+
+        resolved, missing = resolve()
+        if missing and not self.lookups_reloaded:
+            self.lookups_reloaded = True
+            reload_lookups(self.config, self.mirror)
+            resolved, missing = resolve()
+        if "parent" in issue_input:
+            # Parents created since the last sync aren't mirrored yet; ask Linear.
+            parent = self.mirror.linear_issue(issue_input["parent"]) or self.linear.get_issue(issue_input["parent"])
+            if parent:
+                resolved["parentId"] = parent["id"]
+            else:
+                missing.append("parentId")
+        if missing:
+            raise WriteError(
+                f"could not resolve {', '.join(missing)} in Linear team {self.config.linear_team} "
+                "(check the label/status names in config.yaml and the parent identifier)"
+            )
+        return resolved
+
+    # -- Linear ------------------------------------------------------------
+
+    async def linear_ops(self, ops):
+        """Send Linear ops as aliased batches; returns ``{index: result}``."""
+        results, pending = {}, []
+        for index, op in ops:
+            try:
+                create = op["op"] == "linear.create"
+                issue_input = self.resolve_input(op.get("input", {}), create)
+                if create:
+                    # Fixed per key, so a retry can tell whether the create went through.
+                    key = op.get("key")
+                    issue_input["id"] = key_uuid(key) if key else str(uuid.uuid4())
+                pending.append((index, op, issue_input))
+            except (WriteError, KeyError, LinearError, OSError) as exc:
+                results[index] = {"status": "error", "error": str(exc)}
+
+        size = self.settings["linear_batch_size"]
+        for attempt in range(1, self.settings["max_attempts"] + 1):
+            retry = []
+            for start in range(0, len(pending), size):
+                chunk = pending[start:start + size]
+                mutations = [
+                    (f"m{index}", "create" if op["op"] == "linear.create" else "update", op.get("id"), issue_input)
+                    for index, op, issue_input in chunk
+                ]
+                try:
+                    outcome = await self.call(self.linear_bucket, self.linear.mutate_batch, mutations)
+                except (LinearError, OSError) as exc:
+                    outcome = {f"m{index}": exc for index, _, _ in chunk}
+
+                for index, op, issue_input in chunk:
+                    result = outcome[f"m{index}"]
+                    if isinstance(result, Exception) and op["op"] == "linear.create":
+                        # A previous attempt may have created it before failing; the id is ours.
+                        try:
+                            existing = await self.call(self.linear_bucket, self.linear.get_issue, issue_input["id"])
+                        except (LinearError, OSError):
+                            existing = None
+                        if existing:
+                            result = existing
+                    if isinstance(result, Exception):
+                        if is_transient(result) and attempt < self.settings["max_attempts"]:
+                            retry.append((index, op, issue_input))
+                        else:
+                            results[index] = {"status": "error", "error": str(result)}
+                    else:
+                        self.record(op.get("key"), result)
+                        results[index] = {"status": "ok", "result": result}
+            if not retry:
+                break
+            pending = retry
+            await asyncio.sleep(min(2 ** attempt, 30))
+        return results
+
+    # -- GitHub ------------------------------------------------------------
+
+    async def github_op(self, op):
+        number = op["number"]
+        if op["op"] == "github.comment":
+            return await self.call(self.github_bucket, self.github.comment, number, op["body"])
+        if op.get("comment"):
+            # Step-level ledger entry: a re-run close never posts the comment twice.
+            step = op["key"] + ":comment" if op.get("key") else None
+            if self.done(step) is None:
+                comment = await self.call(self.github_bucket, self.github.comment, number, op["comment"])
+                self.record(step, {"id": comment.get("id")})
+        issue = await self.call(self.github_bucket, self.github.close_issue, number, op.get("reason", "completed"))
+        return {"number": issue["number"], "state": issue["state"]}
+
+    async def github_ops(self, ops):
+        # Ops on the same issue run in order; different issues run concurrently.
+        by_issue = {}
+        for index, op in ops:
+            by_issue.setdefault(op.get("number"), []).append((index, op))
+
+        results = {}
+
+        async def run_issue(entries):
+            for index, op in entries:
+                try:
+                    result = await self.github_op(op)
+                except (HttpError, OSError, KeyError) as exc:
+                    results[index] = {"status": "error", "error": str(exc)}
+                    continue
+                self.record(op.get("key"), result)
+                results[index] = {"status": "ok", "result": result}
+
+        await asyncio.gather(*(run_issue(entries) for entries in by_issue.values()))
+        return results
+
+    # -- entry point -------------------------------------------------------
+
+    async def run_ready(self, ready, results):
+        """Run ops whose dependencies are met: Linear and GitHub side by side."""
+        linear, github = [], []
+        for index, op in ready:
+            cached = self.done(op.get("key"))
+            if cached is not None:
+                results[index] = {"status": "cached", "result": cached}
+            elif op["op"].startswith("linear."):
+                linear.append((index, op))
+            elif op["op"].startswith("github."):
+                github.append((index, op))
+            else:
+                results[index] = {"status": "error", "error": f"unknown op {op['op']}"}
+        for partial in await asyncio.gather(self.linear_ops(linear), self.github_ops(github)):
+            results.update(partial)
+
+    async def apply(self, ops):
+        """Run ``ops`` in rounds: each round runs every op whose ``after`` has succeeded."""
+        results = {}
+        by_key = {op["key"]: index for index, op in enumerate(ops) if op.get("key")}
+        waiting = list(enumerate(ops))
+        while waiting:
+            ready, blocked = [], []
+            for index, op in waiting:
+                after = op.get("after")
+                if after is None:
+                    ready.append((index, op))
+                    continue
+                if after in by_key:
+                    if by_key[after] not in results:
+                        blocked.append((index, op))
+                        continue
+                    dependency = results[by_key[after]]
+                else:
+                    # A key from an earlier run.
+                    cached = self.done(after)
+                    dependency = {"status": "cached", "result": cached} if cached else None
+                if dependency is None:
+                    results[index] = {"status": "error", "error": f"unknown dependency {after}"}
+                elif dependency["status"] == "error":
+                    results[index] = {"status": "error", "error": f"not run: {after} failed"}
+                else:
+                    ready.append((index, fill(op, dependency["result"].get("identifier", ""))))
+            if not ready:
+                for index, op in blocked:
+                    results[index] = {"status": "error", "error": f"dependency cycle through {op['after']}"}
+                break
+            await self.run_ready(ready, results)
+            waiting = blocked
+        self.executor.shutdown(wait=False)
+        return [{"op": op["op"], "key": op.get("key"), **results[i]} for i, op in enumerate(ops)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_apply = sub.add_parser("apply", help="apply a JSON list of write operations")
+    p_apply.add_argument("file", help="JSON file, or - for stdin")
+    p_apply.add_argument("--no-sync", action="store_true", help="skip refreshing the mirror afterwards")
+    args = parser.parse_args(argv)
+
+    ops = json.load(sys.stdin if args.file == "-" else open(args.file))
+    config = load_config()
+    mirror = open_mirror(config)
+    if any(op["op"].startswith("linear.") for op in ops) and mirror.lookup("team", config.linear_team) is None:
+        sync(config, mirror, ["linear"])
+
+    results = asyncio.run(WriteClient(config, mirror).apply(ops))
+    print(json.dumps(results, indent=2))
+
+    if not args.no_sync:
+        sources = {op["op"].split(".")[0] for op, r in zip(ops, results) if r["status"] == "ok"}
+        if sources:
+            sync(config, mirror, sorted(sources))
+    return 1 if any(r["status"] == "error" for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
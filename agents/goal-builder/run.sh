@@ -35,6 +35,7 @@ ALLOWED_TOOLS=(
     "Write"
     "Edit"
     "Bash(python:.claude/scripts/goal-builder/*)"
+    "Bash(python:.claude/scripts/shared/*)"
     "Bash(git status)"
     "Bash(git diff)"
     "Glob"
@@ -55,4 +56,5 @@ eval claude \
     --dangerously-skip-permissions \
     $TOOL_ARGS \
     --add-dir \".claude\" \
-    --add-dir \"agents\"
+    --add-dir \"agents\" \
+    \"\$@\"
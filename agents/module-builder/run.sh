@@ -8,6 +8,7 @@ claude \
   --append-system-prompt "$SYSTEM_PROMPT" \
   --add-dir "${MIXER_ROOT}/.claude/commands/module-builder" \
   --add-dir "${MIXER_ROOT}/.claude/scripts/module-builder" \
+  --add-dir "${MIXER_ROOT}/.claude/scripts/shared" \
   "  Module Builder started.
 
 Available commands:
@@ -15,4 +16,5 @@ Available commands:
 - /load-plan
 - /mark-complete
 
-What would you like to build?"
+What would you like to build?" \
+  "$@"
@@ -8,6 +8,7 @@ claude \
   --append-system-prompt "$SYSTEM_PROMPT" \
   --add-dir "${MIXER_ROOT}/.claude/commands/plan-builder" \
   --add-dir "${MIXER_ROOT}/.claude/scripts/plan-builder" \
+  --add-dir "${MIXER_ROOT}/.claude/scripts/shared" \
   "= Plan Builder started.
 
 Available commands:
@@ -15,4 +16,5 @@ Available commands:
 - /analyze-goal
 - /create-plan
 
-What would you like to do?"
+What would you like to do?" \
+  "$@"
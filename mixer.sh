@@ -1,6 +1,7 @@
 #!/bin/bash
 # Mixer System V2 - Main Entry Point
 # Usage: ./mixer.sh <agent-name>
+# Usage: ./mixer.sh batch <agent-name> [options]
 # Example: ./mixer.sh goal-builder
 
 set -e
@@ -18,9 +19,19 @@ if [ -z "$AGENT_NAME" ]; then
     echo "  goal-builder   - Process GitHub issues and create Linear goals"
     echo "  plan-builder   - Break down goals into actionable plans"
     echo "  module-builder - Implement plans as code modules"
+    echo ""
+    echo "Batch mode (headless, parallel over tickets in todo):"
+    echo "  ./mixer.sh batch <agent> [--auto-update] [--workers N] [--limit N] [--dry-run]"
     exit 1
 fi
 
+# Headless batch mode: hand off to the shared batch runner
+if [ "$AGENT_NAME" = "batch" ]; then
+    export MIXER_ROOT
+    cd "$MIXER_ROOT"
+    exec python3 "${MIXER_ROOT}/.claude/scripts/shared/batch.py" "${@:2}"
+fi
+
 # Check if agent exists
 AGENT_DIR="${MIXER_ROOT}/agents/${AGENT_NAME}"
 if [ ! -d "$AGENT_DIR" ]; then
@@ -51,4 +62,4 @@ echo "   Agent: ${AGENT_DIR}"
 echo ""
 
 cd "$MIXER_ROOT"
-exec "${RUN_SCRIPT}"
+exec "${RUN_SCRIPT}" "${@:2}"
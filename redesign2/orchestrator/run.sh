@@ -9,6 +9,9 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 cd "$SCRIPT_DIR"
 
+# Largest prime bundle passed to --append-system-prompt (one argv string)
+PRIME_BUNDLE_MAX_BYTES=120000
+
 # Colors for output
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -46,6 +49,29 @@ check_prerequisites() {
   fi
 }
 
+# Compile the /prime context into one bundle (rebuilt only when a source changes)
+build_prime_bundle() {
+  PRIME_BUNDLE=""
+  local bundler="$SCRIPT_DIR/../../.claude/scripts/shared/prime_bundle.py"
+  if [ -f "$bundler" ] && command -v python3 &> /dev/null; then
+    PRIME_BUNDLE=$(python3 "$bundler" build .) || PRIME_BUNDLE=""
+  fi
+  # The bundle is passed as a single argument, which Linux caps at 128 KiB
+  if [ -n "$PRIME_BUNDLE" ] && [ "$(wc -c < "$PRIME_BUNDLE")" -gt "$PRIME_BUNDLE_MAX_BYTES" ]; then
+    print_msg "$YELLOW" "⚠️  Prime bundle is over $PRIME_BUNDLE_MAX_BYTES bytes, too large to preload"
+    PRIME_BUNDLE=""
+  fi
+}
+
+# Launch Claude CLI, preloading the prime bundle when available
+launch_claude() {
+  if [ -n "$PRIME_BUNDLE" ]; then
+    claude --append-system-prompt "$(cat "$PRIME_BUNDLE")"
+  else
+    claude
+  fi
+}
+
 # Display startup banner
 show_banner() {
   print_msg "$BLUE" "╔════════════════════════════════════════╗"
@@ -81,6 +107,15 @@ main() {
 
   show_workflow
 
+  print_msg "$YELLOW" "📦 Building prime bundle..."
+  build_prime_bundle
+  if [ -n "$PRIME_BUNDLE" ]; then
+    print_msg "$GREEN" "✅ Context preloaded from $(basename "$PRIME_BUNDLE")"
+  else
+    print_msg "$YELLOW" "📝 No prime bundle - remember to run /prime first to load all context!"
+  fi
+  echo ""
+
   print_msg "$BLUE" "🚀 Starting Orchestrator..."
   echo ""
 
@@ -93,7 +128,7 @@ main() {
 
   # Launch Claude CLI with this directory as working directory
   # The CLAUDE.md file will be auto-loaded
-  claude
+  launch_claude
 }
 
 # Trap errors